@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import json
+from random import Random
+import string
+import sys
+from time import perf_counter
+import tracemalloc
+from typing import Callable, Iterator
+
+from color import Depth
+from layout import Dim, Direction, Layout, Padding
+from ref import Ref
+from term import MemoryBackend, Vec, lorem
+from term2 import (
+    Block,
+    RenderTable,
+    Renderable,
+    ScrollList,
+    Span,
+    Style,
+    Term,
+    Text,
+)
+
+DIM: Dim = Dim(200, 60)
+Step = Callable[[int], None]
+Scene = Callable[[], tuple[Term, Step]]
+
+
+def dashboard() -> tuple[Term, Step]:
+    rng: Random = Random(0)
+    statuses: list[str] = [
+        "[yellow]queueing[/yellow]",
+        "[cyan]running[/cyan]",
+        "[green]success[/green]",
+        "[red]failed[/red]",
+    ]
+    tasks: list[Ref[str]] = [Ref(statuses[0]) for _ in range(99)]
+
+    t: Term = Term(
+        layout=Layout(direction=Direction.Horizontal, padding=Padding(1, 2)),
+        border=True,
+        backend=MemoryBackend(*DIM, keep=False),
+    )
+    with t(Block(layout=Layout(direction=Direction.Vertical))):
+        for idx in range(len(tasks)):
+            t(Text(f"{idx + 1}: "))
+    with t(Block(layout=Layout(direction=Direction.Vertical))):
+        for task in tasks:
+            t(Text(task))
+
+    def step(i: int):
+        for _ in range(3):
+            rng.choice(tasks).set_value(rng.choice(statuses))
+
+    return t, step
+
+
+class Grid(Renderable):
+    def __init__(self, seed: int = 0):
+        super().__init__()
+        self.glyphs: str = "".join(
+            Random(seed).choices(string.ascii_letters, k=DIM.w * DIM.h * 2)
+        )
+        self.offset: int = 0
+        self.style: Style = Style.of()
+
+    def size(self, render_table: RenderTable):
+        render_table.set_dim(self, DIM.w, DIM.h)
+
+    def place(self, render_table: RenderTable):
+        self.dirty = False
+
+    def render(self, render_table: RenderTable) -> Iterator[Span]:
+        for y in range(DIM.h):
+            start: int = self.offset + y * DIM.w
+            yield Span(Vec(0, y), self.glyphs[start : start + DIM.w], self.style)
+
+
+def random_grid() -> tuple[Term, Step]:
+    t: Term = Term(backend=MemoryBackend(*DIM, keep=False))
+    grid: Grid = Grid()
+    t(grid)
+
+    def step(i: int):
+        grid.offset = (i * 7) % (DIM.w * DIM.h)
+        grid.mark_dirty()
+
+    return t, step
+
+
+def nested_blocks() -> tuple[Term, Step]:
+    t: Term = Term(backend=MemoryBackend(*DIM, keep=False))
+    counter: Ref[str] = Ref("0")
+    blocks: list[Block] = [
+        Block(layout=Layout(direction=Direction.Vertical), border=True)
+        for _ in range(25)
+    ]
+    for outer, inner in zip(blocks, blocks[1:]):
+        outer.add(Text(f"[blue]{lorem[:30]}[/blue]"))
+        outer.add(inner)
+    blocks[-1].add(Text(counter))
+    t(blocks[0])
+
+    def step(i: int):
+        counter.set_value(f"[green]{i}[/green]")
+
+    return t, step
+
+
+def long_markup() -> tuple[Term, Step]:
+    t: Term = Term(
+        layout=Layout(direction=Direction.Vertical),
+        backend=MemoryBackend(*DIM, keep=False),
+    )
+    words: list[str] = lorem.split()
+    colors: list[str] = ["red", "green", "yellow", "blue", "cyan"]
+    lines: list[Ref[str]] = [Ref("") for _ in range(DIM.h)]
+    for line in lines:
+        t(Text(line))
+
+    def step(i: int):
+        for y, line in enumerate(lines):
+            comps: list[str] = []
+            for k in range(40):
+                word: str = words[(i + y + k) % len(words)]
+                color: str = colors[(i + k) % len(colors)]
+                comps.append(f"[{color}]{word}[/{color}] [[{k}]")
+            line.set_value(" ".join(comps))
+
+    return t, step
+
+
+def offscreen_rows() -> tuple[Term, Step]:
+    t: Term = Term(
+        layout=Layout(direction=Direction.Vertical),
+        backend=MemoryBackend(*DIM, keep=False),
+    )
+    rows: list[Ref[str]] = [Ref(f"[cyan]{i}[/cyan] {lorem[:60]}") for i in range(5000)]
+    for row in rows:
+        t(Text(row))
+
+    def step(i: int):
+        rows[i % DIM.h].set_value(f"[green]{i}[/green] {lorem[:60]}")
+
+    return t, step
+
+
+def mixed_width() -> tuple[Term, Step]:
+    rng: Random = Random(0)
+    names: list[str] = ["ビルド", "데이터 동기화", "構建檢查", "café-naïve", "🚀 deploy"]
+    t: Term = Term(
+        layout=Layout(direction=Direction.Vertical),
+        border=True,
+        backend=MemoryBackend(*DIM, keep=False),
+    )
+    jobs: list[Ref[str]] = [Ref("") for _ in range(DIM.h - 2)]
+    for job in jobs:
+        t(Text(job))
+
+    def step(i: int):
+        for _ in range(3):
+            name: str = rng.choice(names)
+            rng.choice(jobs).set_value(f"[cyan]{name * 12}[/cyan] [green]成功[/green]")
+
+    return t, step
+
+
+def scroll_list() -> tuple[Term, Step]:
+    t: Term = Term(backend=MemoryBackend(*DIM, keep=False))
+    rows: ScrollList[int] = ScrollList(
+        range(100_000),
+        lambda idx, item: f"[cyan]{idx:>6}[/cyan] {lorem[item % 100 : item % 100 + 60]}",
+        height=DIM.h,
+    )
+    t(rows)
+
+    def step(i: int):
+        rows.scroll(1)
+
+    return t, step
+
+
+SCENES: dict[str, Scene] = {
+    "dashboard": dashboard,
+    "random_grid": random_grid,
+    "nested_blocks": nested_blocks,
+    "long_markup": long_markup,
+    "offscreen_rows": offscreen_rows,
+    "scroll_list": scroll_list,
+    "mixed_width": mixed_width,
+}
+
+
+def run(
+    scene: Scene, frames: int, depth: Depth = Depth.TRUECOLOR
+) -> tuple[float, int]:
+    t, step = scene()
+    assert isinstance(t.backend, MemoryBackend)
+    t.backend.depth = depth
+    t.render()
+    n_bytes: int = t.backend.n_bytes
+    t_start: float = perf_counter()
+    for i in range(frames):
+        step(i)
+        t.render()
+    elapsed: float = perf_counter() - t_start
+    return elapsed, t.backend.n_bytes - n_bytes
+
+
+def bench(
+    name: str, frames: int, depth: Depth = Depth.TRUECOLOR
+) -> dict[str, float]:
+    elapsed, n_bytes = run(SCENES[name], frames, depth)
+
+    tracemalloc.start()
+    run(SCENES[name], max(1, frames // 10), depth)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "fps": frames / elapsed,
+        "bytes_per_frame": n_bytes / frames,
+        "peak_kib": peak / 1024,
+    }
+
+
+# fraction by which a metric may get worse before it counts as a regression
+TOLERANCE: dict[str, float] = {"fps": 0.1, "bytes_per_frame": 0.0, "peak_kib": 0.2}
+HIGHER_IS_BETTER: set[str] = {"fps"}
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]
+) -> list[str]:
+    regressions: list[str] = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+
+        for metric, value in metrics.items():
+            base: float = baseline[name][metric]
+            ratio: float = value / base if base else 1
+            worse: bool = (
+                ratio < 1 - TOLERANCE[metric]
+                if metric in HIGHER_IS_BETTER
+                else ratio > 1 + TOLERANCE[metric]
+            )
+            print(
+                f"  {name:<14} {metric:<16} {base:12.1f} -> {value:12.1f}"
+                f" ({ratio:5.2f}x){'  REGRESSION' if worse else ''}"
+            )
+            if worse:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless rendering benchmarks")
+    parser.add_argument("scenes", nargs="*", metavar="scene", help=", ".join(SCENES))
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument(
+        "--depth", default="truecolor", help=", ".join(d.name.lower() for d in Depth)
+    )
+    parser.add_argument("--save", metavar="JSON", help="write results to a file")
+    parser.add_argument("--baseline", metavar="JSON", help="compare against a file")
+    args = parser.parse_args()
+    for name in args.scenes:
+        if name not in SCENES:
+            parser.error(f"unknown scene: {name}")
+    if args.depth.upper() not in Depth.__members__:
+        parser.error(f"unknown depth: {args.depth}")
+    depth: Depth = Depth[args.depth.upper()]
+
+    results: dict[str, dict[str, float]] = {}
+    for name in args.scenes or SCENES:
+        results[name] = bench(name, args.frames, depth)
+        print(
+            f"{name:<14} {results[name]['fps']:9.1f} fps"
+            f" {results[name]['bytes_per_frame']:10.1f} B/frame"
+            f" {results[name]['peak_kib']:9.1f} KiB peak"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline: dict[str, dict[str, float]] = json.load(file)
+        print(f"vs {args.baseline}")
+        regressions: list[str] = compare(results, baseline)
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
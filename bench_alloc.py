@@ -0,0 +1,81 @@
+from collections import Counter
+import sys
+from types import CodeType
+from typing import Callable
+
+import bench
+import term
+import term2
+from term import Box, Label, MemoryBackend, Rect, Screen, Vec, lorem
+
+FRAMES: int = 50
+COUNTED: list[type] = [term.Vec, term.Rect, term.Span, term2.Span]
+
+
+def constructor(cls: type) -> CodeType:
+    for name in ("__new__", "__init__"):
+        func = cls.__dict__.get(name)
+        code = getattr(getattr(func, "__func__", func), "__code__", None)
+        if code is not None:
+            return code
+    raise TypeError(f"{cls.__qualname__} has no python-level constructor")
+
+
+# python-level constructor calls per frame of each geometry type, told apart
+# by code object since generated constructors share a file name and line
+def allocations(frame: Callable[[int], None]) -> dict[str, float]:
+    calls: Counter[CodeType] = Counter()
+
+    def profile(f, event: str, arg: object):
+        if event == "call":
+            calls[f.f_code] += 1
+
+    sys.setprofile(profile)
+    try:
+        for i in range(FRAMES):
+            frame(i)
+    finally:
+        sys.setprofile(None)
+
+    return {
+        f"{cls.__module__}.{cls.__qualname__}": calls[constructor(cls)] / FRAMES
+        for cls in COUNTED
+    }
+
+
+def screen() -> Callable[[int], None]:
+    box: Box = Box(Rect(Vec(0, 0), Vec(120, 40)))
+    block: term.Block = term.Block(Rect(Vec(0, 0), Vec(120, 40)), title="block")
+    for y in range(38):
+        block.add(Label(Rect(Vec(0, y), Vec(118, 1)), lorem[y : y + 118]))
+    box.add(block)
+    s: Screen = Screen(box, backend=MemoryBackend(120, 40, keep=False))
+    return lambda i: s.draw()
+
+
+def scene(name: str) -> Callable[[int], None]:
+    t, step = bench.SCENES[name]()
+    t.render()
+
+    def frame(i: int):
+        step(i)
+        t.render()
+
+    return frame
+
+
+def main():
+    frames: dict[str, Callable[[], Callable[[int], None]]] = {
+        "screen": screen,
+        "dashboard": lambda: scene("dashboard"),
+        "nested_blocks": lambda: scene("nested_blocks"),
+    }
+    for name, make in frames.items():
+        counts: dict[str, float] = allocations(make())
+        print(f"{name:<14} {sum(counts.values()):9.1f} objects/frame")
+        for cls, n in counts.items():
+            print(f"  {cls:<14} {n:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from time import perf_counter
+from typing import Callable
+
+import color
+from color import Color, gradient_at, hsl_batch
+from term import STYLES
+
+
+def timed(func: Callable[[], object], *, n: int) -> float:
+    t_start: float = perf_counter()
+    for _ in range(n):
+        func()
+    return (perf_counter() - t_start) / n
+
+
+def heatmap(w: int, h: int, frame: int) -> list[float]:
+    return [((x + y + frame) % 97) / 97 for y in range(h) for x in range(w)]
+
+
+def main():
+    print(f"numpy: {'yes' if color.np is not None else 'no'}")
+
+    steps: list[float] = [i / 255 for i in range(256)]
+    one: float = timed(
+        lambda: [STYLES.id(bg=Color.hsl(h, 0.8, 0.5)) for h in steps], n=200
+    )
+    batch: float = timed(
+        lambda: STYLES.batch(hsl_batch(steps, 0.8, 0.5), fg=Color.NONE), n=200
+    )
+    print(f"  hsl gradient 256  one {one * 1e3:7.3f}ms  batch {batch * 1e3:7.3f}ms")
+
+    stops: list[Color] = [Color.hex("#000080"), Color.hex("#ffff00"), Color.RED]
+    for w, h in [(80, 24), (200, 50)]:
+        values: list[float] = heatmap(w, h, 0)
+        one = timed(
+            lambda: [
+                STYLES.id(bg=Color.unpack(gradient_at(stops, v)[0])) for v in values
+            ],
+            n=5,
+        )
+        batch = timed(
+            lambda: STYLES.batch(gradient_at(stops, values), fg=Color.NONE), n=50
+        )
+        print(
+            f"  heatmap {f'{w}x{h}':<10} one {one * 1e3:7.3f}ms  batch {batch * 1e3:7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
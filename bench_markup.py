@@ -0,0 +1,59 @@
+from time import perf_counter
+from typing import Callable
+
+from term import lorem
+from term2 import len_markup, parse_markup, resolve_markup
+
+
+def timed(func: Callable[[], object], *, n: int) -> float:
+    t_start: float = perf_counter()
+    for _ in range(n):
+        func()
+    return (perf_counter() - t_start) / n
+
+
+def cases(size: int) -> dict[str, str]:
+    text: str = (lorem * (size // len(lorem) + 1))[:size]
+    return {
+        "plain": text,
+        "tags": "".join(
+            f"[green]{word}[/green] [red]{word}[/] "
+            for word in text.split()
+        )[:size].rsplit("[", 1)[0].rsplit(" ", 1)[0],
+        "escapes": "[[" * (size // 2),
+        "escapes in tags": "[cyan]" + "a[[b" * (size // 4) + "[/cyan]",
+        "nested": "[blue]" * (size // 14) + "x" + "[/]" * (size // 14),
+    }
+
+
+def main():
+    print("status strings")
+    for markup in [
+        "[yellow]queueing[/yellow]",
+        "[cyan]running[/cyan]",
+        "[green]success[/green]",
+        "[red]failed[/red]",
+    ]:
+        cold: float = timed(
+            lambda: (parse_markup.cache_clear(), parse_markup(markup)), n=10000
+        )
+        warm: float = timed(lambda: list(resolve_markup(markup)), n=10000)
+        print(f"  {markup:<28} cold {cold * 1e6:7.2f}us  warm {warm * 1e6:7.2f}us")
+
+    for size in [1_000, 10_000, 100_000]:
+        print(f"size {size}")
+        for name, markup in cases(size).items():
+            n: int = max(1, 1_000_000 // size)
+            cold: float = timed(
+                lambda: (parse_markup.cache_clear(), len_markup(markup)), n=n
+            )
+            warm: float = timed(lambda: len_markup(markup), n=n)
+            print(
+                f"  {name:<16} cold {cold * 1e3:8.3f}ms"
+                f" ({cold * 1e9 / len(markup):6.1f}ns/char)"
+                f"  warm {warm * 1e6:7.2f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
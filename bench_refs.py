@@ -0,0 +1,71 @@
+import argparse
+import gc
+from statistics import median
+from time import perf_counter, sleep
+from typing import Callable
+
+from layout import Direction, Layout
+from ref import AsyncRef, Ref
+from term import MemoryBackend
+from term2 import Term, Text
+
+
+def source(i: int, delay: float) -> Callable[[], str]:
+    n: list[int] = [0]
+
+    def get() -> str:
+        sleep(delay)
+        n[0] += 1
+        return f"[cyan]source {i}[/cyan] {n[0]}"
+
+    return get
+
+
+# frame times with every row fed by a slow data source, read in the frame or
+# refreshed on the worker pool; Term.render polls the refs, so either way each
+# getter runs at most once per frame
+def frames(
+    make: Callable[[Callable[[], str]], Ref[str]], args: argparse.Namespace
+) -> list[float]:
+    t: Term = Term(
+        layout=Layout(direction=Direction.Vertical),
+        backend=MemoryBackend(80, args.sources, keep=False),
+    )
+    for i in range(args.sources):
+        t(Text(make(source(i, args.delay))))
+    t.render()
+
+    times: list[float] = []
+    for _ in range(args.frames):
+        t_start: float = perf_counter()
+        t.render()
+        times.append(perf_counter() - t_start)
+        sleep(1 / args.fps)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="frame time with slow refs")
+    parser.add_argument("--sources", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds per read")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--fps", type=float, default=60)
+    args = parser.parse_args()
+
+    makers: dict[str, Callable[[Callable[[], str]], Ref[str]]] = {
+        "sync": lambda get: Ref(getter=get),
+        "async": lambda get: AsyncRef(get, "", every=0.1),
+    }
+    for name, make in makers.items():
+        times: list[float] = frames(make, args)
+        # the rows are in cycles with their term, and their refs would go on
+        # being polled in the next run
+        gc.collect()
+        print(
+            f"{name:<6} median {median(times) * 1e3:8.2f}ms"
+            f"  max {max(times) * 1e3:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+from statistics import median
+import subprocess
+import sys
+
+# what a short-lived tool pays before its first frame, timed inside a fresh
+# interpreter so that nothing is already imported
+CHILD: str = """
+from time import perf_counter
+t_start = perf_counter()
+from term import MemoryBackend
+from term2 import Term, Text
+t_imported = perf_counter()
+t = Term(backend=MemoryBackend(80, 24, keep=False))
+t(Text("[green]ready[/green]"))
+t.render()
+t_frame = perf_counter()
+print(t_imported - t_start, t_frame - t_start)
+"""
+
+
+def sample() -> tuple[float, float]:
+    out: str = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    imported, frame = map(float, out.split())
+    return imported, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import-to-first-frame time")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    # the first run may have to write bytecode caches
+    sample()
+    samples: list[tuple[float, float]] = [sample() for _ in range(args.runs)]
+    for name, times in zip(("import", "first frame"), zip(*samples)):
+        print(
+            f"{name:<12} median {median(times) * 1e3:7.2f}ms"
+            f"  min {min(times) * 1e3:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,91 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from enum import IntEnum
+from functools import cached_property, lru_cache
 from math import floor
-from typing import Callable, ClassVar
+from typing import ClassVar, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class InvalidColorError(Exception):
     pass
 
 
+# bits per colour a terminal can show
+class Depth(IntEnum):
+    SYSTEM16 = 4
+    XTERM256 = 8
+    TRUECOLOR = 24
+
+
+RGB = tuple[int, int, int]
+
+# xterm's default palette, used to match against the system colours
+SYSTEM_RGB: list[RGB] = [
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+]
+
+XTERM_LEVELS: tuple[int, ...] = (0, 95, 135, 175, 215, 255)
+
+# nearest step of the 6x6x6 cube for each channel value, and of the 24-step
+# grey ramp for each r + g + b
+CUBE_STEP: list[int] = [
+    min(range(6), key=lambda i: abs(XTERM_LEVELS[i] - v)) for v in range(256)
+]
+GRAY_STEP: list[int] = [
+    min(23, max(0, round((v / 3 - 8) / 10))) for v in range(3 * 255 + 1)
+]
+
+
+def xterm_rgb(n: int) -> RGB:
+    if n < 16:
+        return SYSTEM_RGB[n]
+
+    if n < 232:
+        n -= 16
+        return XTERM_LEVELS[n // 36], XTERM_LEVELS[n // 6 % 6], XTERM_LEVELS[n % 6]
+
+    gray: int = 8 + 10 * (n - 232)
+    return gray, gray, gray
+
+
+def distance(a: RGB, b: RGB) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+# the palette's first 16 entries are left out, since terminals theme them
+def xterm_index(r: int, g: int, b: int) -> int:
+    cube: int = 16 + 36 * CUBE_STEP[r] + 6 * CUBE_STEP[g] + CUBE_STEP[b]
+    gray: int = 232 + GRAY_STEP[r + g + b]
+    rgb: RGB = (r, g, b)
+    return min(cube, gray, key=lambda n: distance(xterm_rgb(n), rgb))
+
+
+def system_index(r: int, g: int, b: int) -> int:
+    rgb: RGB = (r, g, b)
+    return min(range(16), key=lambda c: distance(SYSTEM_RGB[c], rgb))
+
+
 @dataclass(frozen=True)
 class Color:
     r: int
@@ -21,8 +98,9 @@ class Color:
         ansi_fg: str
         ansi_bg: str
 
-    NO_COLOR: ClassVar[int] = 1
-    SYSTEM_COLOR: ClassVar[int] = 2
+    # outside 0-255 so they cannot be mistaken for a dark rgb colour
+    NO_COLOR: ClassVar[int] = -1
+    SYSTEM_COLOR: ClassVar[int] = -2
     SYSTEM_COLORS: ClassVar[list[SystemColor]] = [
         SystemColor("black", "\x1b[30m", "\x1b[40m"),
         SystemColor("red", "\x1b[31m", "\x1b[41m"),
@@ -61,7 +139,49 @@ class Color:
             case r, g, b:
                 return f"Color({r=}, {g=}, {b=})"
 
-    @property
+    @cached_property
+    def sgr_fg(self) -> str:
+        match self.r, self.g, self.b:
+            case Color.NO_COLOR, _, _:
+                return "39"
+
+            case Color.SYSTEM_COLOR, c, _:
+                return str(30 + c if c < 8 else 90 + c - 8)
+
+            case r, g, b:
+                return f"38;2;{r};{g};{b}"
+
+    @cached_property
+    def sgr_bg(self) -> str:
+        match self.r, self.g, self.b:
+            case Color.NO_COLOR, _, _:
+                return "49"
+
+            case Color.SYSTEM_COLOR, c, _:
+                return str(40 + c if c < 8 else 100 + c - 8)
+
+            case r, g, b:
+                return f"48;2;{r};{g};{b}"
+
+    # sgr parameters for this colour on a terminal of the given depth, with
+    # truecolour mapped to the nearest colour it can show
+    @lru_cache(maxsize=4096)
+    def sgr_at(self, depth: Depth, bg: bool = False) -> str:
+        match self.r, self.g, self.b:
+            case (Color.NO_COLOR | Color.SYSTEM_COLOR), _, _:
+                return self.sgr_bg if bg else self.sgr_fg
+
+            case r, g, b if depth == Depth.XTERM256:
+                return f"{48 if bg else 38};5;{xterm_index(r, g, b)}"
+
+            case r, g, b if depth == Depth.SYSTEM16:
+                color: Color = Color.system(system_index(r, g, b))
+                return color.sgr_bg if bg else color.sgr_fg
+
+            case _:
+                return self.sgr_bg if bg else self.sgr_fg
+
+    @cached_property
     def ansi_fg(self) -> str:
         match self.r, self.g, self.b:
             case Color.NO_COLOR, _, _:
@@ -73,7 +193,7 @@ class Color:
             case r, g, b:
                 return f"\x1b[38;2;{r};{g};{b}m"
 
-    @property
+    @cached_property
     def ansi_bg(self) -> str:
         match self.r, self.g, self.b:
             case Color.NO_COLOR, _, _:
@@ -87,6 +207,8 @@ class Color:
 
     @staticmethod
     def system(color: int) -> Color:
+        if 0 <= color < len(SYSTEM):
+            return SYSTEM[color]
         return Color(Color.SYSTEM_COLOR, color, 0)
 
     @staticmethod
@@ -102,41 +224,30 @@ class Color:
             raise ValueError(f"invalid hex color: {color!r}")
         return Color(r, g, b)
 
-    # see: https://gist.github.com/ciembor/1494530
     @staticmethod
-    def hsl(h: float, s: float, l: float):
-        scale: Callable[[float], int] = lambda v: floor(v * 255)
-
-        if s == 0:
-            return Color(scale(l), scale(l), scale(l))
-
-        else:
-
-            def hue2rgb(p: float, q: float, t: float) -> int:
-                v: float
-
-                if t < 0:
-                    t += 1
-                if t > 1:
-                    t -= 1
-                if t < 1 / 6:
-                    v = p + (q - p) * 6 * t
-                elif t < 1 / 2:
-                    v = q
-                elif t < 2 / 3:
-                    v = p + (q - p) * (2 / 3 - t) * 6
-                else:
-                    v = p
-
-                return scale(v)
-
-            q: float = l * (1 + s) if l < 0.5 else l + s - l * s
-            p: float = 2 * l - q
-            return Color(
-                hue2rgb(p, q, h + 1 / 3),
-                hue2rgb(p, q, h),
-                hue2rgb(p, q, h - 1 / 3),
-            )
+    def hsl(h: float, s: float, l: float) -> Color:
+        return Color.unpack(hsl_packed(h, s, l))
+
+    @staticmethod
+    def unpack(color: int) -> Color:
+        return Color(color >> 16, color >> 8 & 0xFF, color & 0xFF)
+
+    @cached_property
+    def packed(self) -> int:
+        r, g, b = self.rgb
+        return r << 16 | g << 8 | b
+
+    @cached_property
+    def rgb(self) -> RGB:
+        match self.r, self.g, self.b:
+            case Color.NO_COLOR, _, _:
+                raise InvalidColorError("no color has no rgb")
+
+            case Color.SYSTEM_COLOR, c, _:
+                return SYSTEM_RGB[c]
+
+            case r, g, b:
+                return r, g, b
 
     @staticmethod
     def coerce(color: Color | str) -> Color:
@@ -168,6 +279,111 @@ class Color:
     WHITE: ClassVar[Color] = ...  # type: ignore
 
 
+# batches of colours are lists of ints packed as 0xrrggbb, which numpy can
+# build in one go and which hash cheaply when interned into styles
+Floats = float | Sequence[float]
+
+
+# see: https://gist.github.com/ciembor/1494530
+def _hue(p: float, q: float, t: float) -> float:
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1 / 6:
+        return p + (q - p) * 6 * t
+    elif t < 1 / 2:
+        return q
+    elif t < 2 / 3:
+        return p + (q - p) * (2 / 3 - t) * 6
+    else:
+        return p
+
+
+def hsl_packed(h: float, s: float, l: float) -> int:
+    if s == 0:
+        v: int = floor(l * 255)
+        return v << 16 | v << 8 | v
+
+    q: float = l * (1 + s) if l < 0.5 else l + s - l * s
+    p: float = 2 * l - q
+    return (
+        floor(_hue(p, q, h + 1 / 3) * 255) << 16
+        | floor(_hue(p, q, h) * 255) << 8
+        | floor(_hue(p, q, h - 1 / 3) * 255)
+    )
+
+
+def _broadcast(*args: Floats) -> list[Sequence[float]]:
+    n: int = max((len(arg) for arg in args if isinstance(arg, Sequence)), default=1)
+    return [arg if isinstance(arg, Sequence) else [arg] * n for arg in args]
+
+
+def hsl_batch(h: Floats, s: Floats, l: Floats) -> list[int]:
+    if np is None:
+        return list(map(hsl_packed, *_broadcast(h, s, l)))
+
+    h_, s_, l_ = np.broadcast_arrays(
+        np.asarray(h, dtype=float), np.asarray(s, dtype=float), np.asarray(l, dtype=float)
+    )
+    q = np.where(l_ < 0.5, l_ * (1 + s_), l_ + s_ - l_ * s_)
+    p = 2 * l_ - q
+
+    def hue(t):
+        t = np.where(t < 0, t + 1, t)
+        t = np.where(t > 1, t - 1, t)
+        v = np.select(
+            [t < 1 / 6, t < 1 / 2, t < 2 / 3],
+            [p + (q - p) * 6 * t, q, p + (q - p) * (2 / 3 - t) * 6],
+            p,
+        )
+        return np.floor(np.where(s_ == 0, l_, v) * 255).astype(np.int64)
+
+    return (hue(h_ + 1 / 3) << 16 | hue(h_) << 8 | hue(h_ - 1 / 3)).ravel().tolist()
+
+
+def lerp_batch(a: Color, b: Color, t: Floats) -> list[int]:
+    return gradient_at([a, b], t)
+
+
+# colours at positions t in [0, 1] along evenly spaced stops
+def gradient_at(stops: Sequence[Color], t: Floats) -> list[int]:
+    if len(stops) < 2:
+        raise ValueError("a gradient needs at least two stops")
+
+    ts: Sequence[float] = t if isinstance(t, Sequence) else [t]
+    if np is not None:
+        xs = np.linspace(0, 1, len(stops))
+        t_ = np.clip(np.asarray(ts, dtype=float), 0, 1)
+        r, g, b = (
+            np.rint(np.interp(t_, xs, [stop.rgb[i] for stop in stops])).astype(np.int64)
+            for i in range(3)
+        )
+        return (r << 16 | g << 8 | b).tolist()
+
+    rgbs: list[RGB] = [stop.rgb for stop in stops]
+    last: int = len(stops) - 1
+    out: list[int] = []
+    for t_ in ts:
+        x: float = min(max(t_, 0), 1) * last
+        i: int = min(int(x), last - 1)
+        f: float = x - i
+        (r0, g0, b0), (r1, g1, b1) = rgbs[i], rgbs[i + 1]
+        out.append(
+            round(r0 + (r1 - r0) * f) << 16
+            | round(g0 + (g1 - g0) * f) << 8
+            | round(b0 + (b1 - b0) * f)
+        )
+    return out
+
+
+def gradient(stops: Sequence[Color], n: int) -> list[int]:
+    return gradient_at(stops, [i / max(1, n - 1) for i in range(n)])
+
+
+# interned so that the escapes cached on each are shared
+SYSTEM: list[Color] = [Color(Color.SYSTEM_COLOR, c, 0) for c in range(16)]
+
 Color.NONE = Color(Color.NO_COLOR, -1, -1)
 Color.BLACK = Color.system(0)
 Color.RED = Color.system(1)
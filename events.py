@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import codecs
+from enum import Enum, IntFlag
+import os
+import re
+import sys
+from typing import Callable, NamedTuple
+
+try:
+    import termios
+except ImportError:
+    termios = None
+
+from loop import Loop, Timer
+from term import f, w
+
+PASTE_ON = "\x1b[?2004h"
+PASTE_OFF = "\x1b[?2004l"
+PASTE_BEGIN = "\x1b[200~"
+PASTE_END = "\x1b[201~"
+# presses and releases, motion while a button is held, sgr encoded reports
+MOUSE_ON = "\x1b[?1000h\x1b[?1002h\x1b[?1006h"
+MOUSE_OFF = "\x1b[?1006l\x1b[?1002l\x1b[?1000l"
+# motion with no button held as well
+MOTION_ON = "\x1b[?1003h"
+MOTION_OFF = "\x1b[?1003l"
+
+# how long a lone escape waits for the rest of a sequence before it counts as
+# the escape key
+ESC_DELAY: float = 0.05
+
+
+# as in the xterm modifier parameter, less one
+class Mod(IntFlag):
+    NONE = 0
+    SHIFT = 1
+    ALT = 2
+    CTRL = 4
+
+
+class Key(NamedTuple):
+    # a character, or a name such as "enter", "up" or "f5"
+    key: str
+    mods: Mod = Mod.NONE
+
+
+class Paste(NamedTuple):
+    text: str
+
+
+class MouseAction(Enum):
+    Press = "press"
+    Release = "release"
+    Move = "move"
+    Scroll = "scroll"
+
+
+class Mouse(NamedTuple):
+    x: int
+    y: int
+    action: MouseAction
+    # 0 left, 1 middle, 2 right, 3 none; for scrolls 0 up, 1 down, 2 left, 3 right
+    button: int
+    mods: Mod = Mod.NONE
+
+
+Event = Key | Paste | Mouse
+
+# sgr mouse report, csi sequence, ss3 sequence, alt and a key, or a lone character
+TOKEN = re.compile(
+    r"\x1b\[<(\d+);(\d+);(\d+)([Mm])"
+    r"|\x1b\[([0-?]*)[ -/]*([@-~])"
+    r"|\x1bO([@-~])"
+    r"|\x1b(.)"
+    r"|(.)",
+    re.DOTALL,
+)
+# a sequence cut short by the end of what has been read so far
+INCOMPLETE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|O)?\Z")
+
+FINAL_KEYS: dict[str, str] = {
+    "A": "up",
+    "B": "down",
+    "C": "right",
+    "D": "left",
+    "E": "begin",
+    "F": "end",
+    "H": "home",
+    "P": "f1",
+    "Q": "f2",
+    "R": "f3",
+    "S": "f4",
+}
+
+TILDE_KEYS: dict[int, str] = {
+    1: "home",
+    2: "insert",
+    3: "delete",
+    4: "end",
+    5: "page_up",
+    6: "page_down",
+    7: "home",
+    8: "end",
+    11: "f1",
+    12: "f2",
+    13: "f3",
+    14: "f4",
+    15: "f5",
+    17: "f6",
+    18: "f7",
+    19: "f8",
+    20: "f9",
+    21: "f10",
+    23: "f11",
+    24: "f12",
+}
+
+CONTROL_KEYS: dict[str, Key] = {
+    "\r": Key("enter"),
+    "\n": Key("enter"),
+    "\t": Key("tab"),
+    "\x7f": Key("backspace"),
+    "\x08": Key("backspace"),
+    "\x1b": Key("escape"),
+    "\x00": Key(" ", Mod.CTRL),
+}
+
+
+def control_key(ch: str) -> Key:
+    key: Key | None = CONTROL_KEYS.get(ch)
+    if key is not None:
+        return key
+
+    c: int = ord(ch)
+    if c < 0x20:
+        return Key(chr(c + 0x60), Mod.CTRL)
+
+    return Key(ch)
+
+
+def modifiers(param: str) -> Mod:
+    return Mod(int(param) - 1 & 7) if param.isdigit() and param != "0" else Mod.NONE
+
+
+def csi_key(params: str, final: str) -> Key | None:
+    args: list[str] = params.split(";")
+    mods: Mod = modifiers(args[1]) if len(args) > 1 else Mod.NONE
+    if final == "~":
+        name: str | None = TILDE_KEYS.get(int(args[0])) if args[0].isdigit() else None
+        return None if name is None else Key(name, mods)
+
+    if final == "Z":
+        return Key("tab", mods | Mod.SHIFT)
+
+    name = FINAL_KEYS.get(final)
+    return None if name is None else Key(name, mods)
+
+
+def mouse_event(code: int, x: int, y: int, press: bool) -> Mouse:
+    mods: Mod = Mod(code >> 2 & 7)
+    if code & 64:
+        return Mouse(x - 1, y - 1, MouseAction.Scroll, code & 3, mods)
+
+    if code & 32:
+        return Mouse(x - 1, y - 1, MouseAction.Move, code & 3, mods)
+
+    action: MouseAction = MouseAction.Press if press else MouseAction.Release
+    return Mouse(x - 1, y - 1, action, code & 3, mods)
+
+
+# incremental, since a read can end anywhere: in the middle of an escape
+# sequence, or of a paste
+class Parser:
+    def __init__(self):
+        self.buf: str = ""
+        # text of the paste in progress
+        self.paste: list[str] | None = None
+
+    # whether an escape sequence is waiting on the rest of it
+    @property
+    def waiting(self) -> bool:
+        return self.paste is None and bool(self.buf)
+
+    def feed(self, text: str) -> list[Event]:
+        self.buf += text
+        events: list[Event] = []
+        while self.buf:
+            if self.paste is not None:
+                end: int = self.buf.find(PASTE_END)
+                if end < 0:
+                    # keep what may be the start of the end marker
+                    keep: int = len(PASTE_END) - 1
+                    self.paste.append(self.buf[:-keep])
+                    self.buf = self.buf[-keep:]
+                    break
+
+                self.paste.append(self.buf[:end])
+                events.append(Paste("".join(self.paste)))
+                self.paste = None
+                self.buf = self.buf[end + len(PASTE_END) :]
+                continue
+
+            cut: re.Match[str] | None = INCOMPLETE.search(self.buf)
+            end = len(self.buf) if cut is None else cut.start()
+            pos: int = 0
+            while pos < end:
+                m: re.Match[str] | None = TOKEN.match(self.buf, pos, end)
+                assert m is not None
+                pos = m.end()
+                if m.group(0) == PASTE_BEGIN:
+                    self.paste = []
+                    break
+
+                event: Event | None = self._event(m)
+                if event is not None:
+                    events.append(event)
+
+            self.buf = self.buf[pos:]
+            if self.paste is None:
+                break
+        return events
+
+    # give up on a sequence that never finished: a lone escape is the key,
+    # anything after it is read as keys of its own
+    def flush(self) -> list[Event]:
+        if not self.waiting:
+            return []
+
+        rest: str = self.buf[1:]
+        self.buf = ""
+        return [Key("escape"), *(control_key(ch) for ch in rest)]
+
+    def _event(self, m: re.Match[str]) -> Event | None:
+        code, x, y, kind, params, final, ss3, alt, ch = m.groups()
+        if code is not None:
+            return mouse_event(int(code), int(x), int(y), kind == "M")
+
+        elif final is not None:
+            if params.startswith("<"):
+                return None
+            return csi_key(params, final)
+
+        elif ss3 is not None:
+            return csi_key("", ss3)
+
+        elif alt is not None:
+            key: Key = control_key(alt)
+            return Key(key.key, key.mods | Mod.ALT)
+
+        else:
+            return control_key(ch)
+
+
+# motion reports come as fast as the mouse moves; of a run of them only the
+# last is kept, so that a drag costs one event per frame
+def coalesce(events: list[Event]) -> list[Event]:
+    out: list[Event] = []
+    for event in events:
+        if (
+            isinstance(event, Mouse)
+            and event.action is MouseAction.Move
+            and out
+            and isinstance(out[-1], Mouse)
+            and out[-1].action is MouseAction.Move
+            and (out[-1].button, out[-1].mods) == (event.button, event.mods)
+        ):
+            out[-1] = event
+        else:
+            out.append(event)
+    return out
+
+
+# reads the terminal from the loop's wait between frames, so there is no
+# thread and no polling; events are handed out once per dispatch
+class Input:
+    def __init__(
+        self,
+        loop: Loop,
+        *,
+        fd: int | None = None,
+        mouse: bool = True,
+        motion: bool = False,
+        paste: bool = True,
+    ):
+        self.loop: Loop = loop
+        self.fd: int = sys.stdin.fileno() if fd is None else fd
+        self.mouse: bool = mouse
+        self.motion: bool = motion
+        self.paste: bool = paste
+
+        self.handlers: list[Callable[[Event], None]] = []
+        self.parser: Parser = Parser()
+        self.pending: list[Event] = []
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(
+            "utf-8"
+        )("replace")
+        self._saved: list | None = None
+        self._expire: Timer | None = None
+        self._scheduled: bool = False
+
+    def on(self, handler: Callable[[Event], None]) -> Callable[[Event], None]:
+        self.handlers.append(handler)
+        return handler
+
+    def start(self):
+        if termios is not None and os.isatty(self.fd):
+            self._saved = termios.tcgetattr(self.fd)
+            attrs: list = termios.tcgetattr(self.fd)
+            # raw input, but keep isig so ctrl-c still interrupts, and leave
+            # output processing alone
+            attrs[0] &= ~(
+                termios.BRKINT
+                | termios.ICRNL
+                | termios.INPCK
+                | termios.ISTRIP
+                | termios.IXON
+            )
+            attrs[3] &= ~(termios.ECHO | termios.ICANON | termios.IEXTEN)
+            attrs[6][termios.VMIN] = 1
+            attrs[6][termios.VTIME] = 0
+            termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+
+        w(
+            (PASTE_ON if self.paste else "")
+            + (MOUSE_ON if self.mouse else "")
+            + (MOTION_ON if self.mouse and self.motion else "")
+        )
+        f()
+        self.loop.add_reader(self.fd, self._read)
+
+    def stop(self):
+        self.loop.remove_reader(self.fd)
+        if self._expire is not None:
+            self._expire.cancel()
+        w(
+            (MOTION_OFF if self.mouse and self.motion else "")
+            + (MOUSE_OFF if self.mouse else "")
+            + (PASTE_OFF if self.paste else "")
+        )
+        f()
+        if self._saved is not None:
+            assert termios is not None
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def __enter__(self) -> Input:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object):
+        self.stop()
+
+    def feed(self, data: bytes):
+        self._queue(self.parser.feed(self._decoder.decode(data)))
+        if self._expire is not None:
+            self._expire.cancel()
+            self._expire = None
+        if self.parser.waiting:
+            self._expire = self.loop.after(self._give_up, seconds=ESC_DELAY)
+
+    # only called once the fd is readable, and with vmin=1 one read returns
+    # what is there without blocking; the fd is left blocking, since on a tty
+    # it shares its file description with stdout
+    def _read(self):
+        data: bytes = os.read(self.fd, 4096)
+
+        if not data:
+            self.loop.remove_reader(self.fd)
+            return
+
+        self.feed(data)
+
+    def _give_up(self):
+        self._expire = None
+        self._queue(self.parser.flush())
+
+    def _queue(self, events: list[Event]):
+        if not events:
+            return
+
+        self.pending.extend(events)
+        if not self._scheduled:
+            self._scheduled = True
+            self.loop.call_soon(self.dispatch)
+
+    def dispatch(self):
+        self._scheduled = False
+        events, self.pending = coalesce(self.pending), []
+        for event in events:
+            for handler in self.handlers:
+                handler(event)
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import ClassVar, Iterator, TypeAlias
+from typing import Iterator
 
-from term import Span, Vec
+from term import Vec
 
 
 class Direction(Enum):
@@ -73,7 +73,8 @@ class Layout:
     gap: int = 0
 
     # todo: type annotation
-    def size(self, contents, render_table) -> Dim:
+    # inset: extra padding on every side, e.g. for a border
+    def size(self, contents, render_table, *, inset: int = 0) -> Dim:
         dim: Dim = Dim(0, 0)
         match self.sizing.w:
             case Fixed(value):
@@ -83,17 +84,15 @@ class Layout:
                 match self.direction:
                     case Direction.Horizontal:
                         for thing in contents:
-                            w, _ = render_table[thing].dim
-                            dim.w += w
+                            dim.w += render_table.w[render_table.slot(thing)]
 
                         dim.w += max(0, len(contents) - 1) * self.gap
 
                     case Direction.Vertical:
                         for thing in contents:
-                            w, _ = render_table[thing].dim
-                            dim.w = max(dim.w, w)
+                            dim.w = max(dim.w, render_table.w[render_table.slot(thing)])
 
-                dim.w += self.padding.left + self.padding.right
+                dim.w += self.padding.left + self.padding.right + 2 * inset
 
         match self.sizing.h:
             case Fixed(value):
@@ -103,34 +102,47 @@ class Layout:
                 match self.direction:
                     case Direction.Horizontal:
                         for thing in contents:
-                            _, h = render_table[thing].dim
-                            dim.h = max(dim.h, h)
+                            dim.h = max(dim.h, render_table.h[render_table.slot(thing)])
 
                     case Direction.Vertical:
                         for thing in contents:
-                            _, h = render_table[thing].dim
-                            dim.h += h
+                            dim.h += render_table.h[render_table.slot(thing)]
 
                         dim.h += max(0, len(contents) - 1) * self.gap
 
-                dim.h += self.padding.top + self.padding.bottom
+                dim.h += self.padding.top + self.padding.bottom + 2 * inset
 
         return dim
 
     # todo: type annotation
     # todo: enforce .size() first then .place()
-    def place(self, contents, render_table):
-        pos: Vec = Vec(self.padding.left, self.padding.top)
+    # start: things before it are where they were, so carry on from the last
+    def place(self, contents, render_table, *, inset: int = 0, start: int = 0):
+        x: int = self.padding.left + inset
+        y: int = self.padding.top + inset
+        xs, ys = render_table.x, render_table.y
+        if start > 0:
+            prev: int = render_table.slot(contents[start - 1])
+            x, y = xs[prev], ys[prev]
+            match self.direction:
+                case Direction.Horizontal:
+                    x += render_table.w[prev] + self.gap
+
+                case Direction.Vertical:
+                    y += render_table.h[prev] + self.gap
+
         match self.direction:
             case Direction.Horizontal:
-                for thing in contents:
-                    render_table[thing].pos = pos
-                    pos += Vec(render_table[thing].dim.w + self.gap, 0)
+                for idx in range(start, len(contents)):
+                    slot: int = render_table.slot(contents[idx])
+                    xs[slot], ys[slot] = x, y
+                    x += render_table.w[slot] + self.gap
 
             case Direction.Vertical:
-                for thing in contents:
-                    render_table[thing].pos = pos
-                    pos += Vec(0, render_table[thing].dim.h + self.gap)
+                for idx in range(start, len(contents)):
+                    slot: int = render_table.slot(contents[idx])
+                    xs[slot], ys[slot] = x, y
+                    y += render_table.h[slot] + self.gap
 
 
 @dataclass
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from time import monotonic, sleep
-from typing import Callable
+from dataclasses import dataclass, field
+from heapq import heapify, heappop, heappush
+from inspect import isawaitable, iscoroutine, iscoroutinefunction
+from math import floor
+from time import monotonic, perf_counter, sleep
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from stats import Stats, func_name
+
+# asyncio is only needed under Loop.run(), and is slow to import; selectors
+# only once something reads input
+if TYPE_CHECKING:
+    import asyncio
+    import selectors
 
 
 Func = Callable[[], None]
+# coroutine functions are only allowed under Loop.run()
+AsyncFunc = Callable[[], Awaitable[None]]
 
 
 @dataclass
@@ -14,6 +27,7 @@ class State:
     t_start_abs: float = 0
     t_last_abs: float = 0
     t_abs: float = 0
+    stats: Stats = field(default_factory=Stats)
 
     @property
     def t_last(self) -> float:
@@ -24,74 +38,289 @@ class State:
         return self.t_abs - self.t_start_abs
 
 
+@dataclass(eq=False)
+class Timer:
+    loop: Loop = field(repr=False)
+    func: Func | AsyncFunc
+    when: float
+    # None for one-shot timers
+    seconds: float | None = None
+    cancelled: bool = False
+    # in the loop's heap, where a cancel leaves it to be dropped lazily
+    scheduled: bool = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            if self.scheduled:
+                self.loop._n_cancelled += 1
+
+
 class Loop:
     def __init__(self, *, max_fps: float | None = 120):
         self.max_fps: float | None = max_fps
 
         self.funcs: list[Func] = []
+        # heap of (when, seq, timer), seq keeps same-time timers in order
+        self.timers: list[tuple[float, int, Timer]] = []
         self.state: State = State()
         self.stopped: bool = False
+        self.running: bool = False
+
+        self._seq: int = 0
+        self._n_cancelled: int = 0
 
+        # run once at the start of the next dispatch
+        self._soon: list[Func] = []
+        # called from the wait between frames when their fd is readable
+        self.readers: dict[int, Func] = {}
+        self._selector: selectors.BaseSelector | None = None
+
+        # only set under run()
+        self._tasks: set[asyncio.Task] | None = None
+        self._frame_waiters: list[asyncio.Future[None]] = []
+
+    # run every frame and not awaited, so coroutines have no place here; use a
+    # timer or Loop.next_frame() instead
     def register(self, func: Func):
+        if iscoroutinefunction(func):
+            raise TypeError(f"per-frame funcs cannot be coroutines: {func!r}")
+
         self.funcs.append(func)
 
     def unregister(self, func: Func):
         self.funcs = [f for f in self.funcs if f is not func]
 
-    def after(self, func: Func, *, seconds: float):
-        if seconds <= 0:
-            raise ValueError(f"seconds must > 0, got: {seconds}")
+    def call_soon(self, func: Func | AsyncFunc):
+        self._soon.append(func)
+
+    def add_reader(self, fd: int, func: Func):
+        import selectors
 
-        when: float = monotonic() + seconds
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+        if fd in self.readers:
+            self._selector.modify(fd, selectors.EVENT_READ, func)
+        else:
+            self._selector.register(fd, selectors.EVENT_READ, func)
+        self.readers[fd] = func
+        if self._tasks is not None:
+            import asyncio
 
-        def wrapped():
-            if monotonic() >= when:
-                func()
-                self.unregister(wrapped)
+            asyncio.get_running_loop().add_reader(fd, func)
 
-        self.register(wrapped)
+    def remove_reader(self, fd: int):
+        if self.readers.pop(fd, None) is None:
+            return
 
-    def interval(self, func: Func, *, seconds: float, after: float = 0):
+        assert self._selector is not None
+        self._selector.unregister(fd)
+        if self._tasks is not None:
+            import asyncio
+
+            asyncio.get_running_loop().remove_reader(fd)
+
+    def _schedule(self, timer: Timer):
+        heappush(self.timers, (timer.when, self._seq, timer))
+        timer.scheduled = True
+        self._seq += 1
+
+    def after(self, func: Func | AsyncFunc, *, seconds: float) -> Timer:
         if seconds <= 0:
             raise ValueError(f"seconds must > 0, got: {seconds}")
 
-        when: float = monotonic() + after
+        timer: Timer = Timer(self, func, monotonic() + seconds)
+        self._schedule(timer)
+        return timer
 
-        def wrapped():
-            nonlocal when
-            now: float = monotonic()
-            if now >= when:
-                func()
-                while when <= now:
-                    when += seconds
+    def interval(
+        self, func: Func | AsyncFunc, *, seconds: float, after: float = 0
+    ) -> Timer:
+        if seconds <= 0:
+            raise ValueError(f"seconds must > 0, got: {seconds}")
+
+        timer: Timer = Timer(self, func, monotonic() + after, seconds)
+        self._schedule(timer)
+        return timer
+
+    def n_times_per_second(self, func: Func | AsyncFunc, *, n: int) -> Timer:
+        return self.interval(func, seconds=1 / n)
+
+    def _run_timers(self, now: float):
+        stats: Stats = self.state.stats
+        while self.timers and self.timers[0][0] <= now:
+            _, _, timer = heappop(self.timers)
+            timer.scheduled = False
+            if timer.cancelled:
+                self._n_cancelled -= 1
+                continue
+
+            if timer.seconds is None:
+                # spent, so a late cancel() is a no-op
+                timer.cancelled = True
+            stats.add("timer.lateness", now - timer.when)
+            t_start: float = perf_counter()
+            self._call(timer.func)
+            stats.add(f"timer.{func_name(timer.func)}", perf_counter() - t_start)
+            if timer.seconds is not None and not timer.cancelled:
+                # skip missed runs rather than firing them in a burst
+                timer.when += (floor((now - timer.when) / timer.seconds) + 1) * (
+                    timer.seconds
+                )
+                self._schedule(timer)
+
+        # drop cancelled timers once they make up most of the heap
+        if self._n_cancelled > 64 and self._n_cancelled * 2 > len(self.timers):
+            self.timers = [entry for entry in self.timers if not entry[2].cancelled]
+            heapify(self.timers)
+            self._n_cancelled = 0
 
-        self.register(wrapped)
+    def _call(self, func: Func | AsyncFunc):
+        result = func()
+        if isawaitable(result):
+            if self._tasks is None:
+                if iscoroutine(result):
+                    result.close()
+                raise RuntimeError("coroutine callbacks require Loop.run()")
 
-    def n_times_per_second(self, func: Func, *, n: int):
-        self.interval(func, seconds=1 / n)
+            import asyncio
+
+            task: asyncio.Task = asyncio.ensure_future(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
     def dispatch(self):
+        stats: Stats = self.state.stats
+        t_dispatch: float = perf_counter()
         self.state.t_abs = monotonic()
+        soon, self._soon = self._soon, []
+        for func in soon:
+            t_start: float = perf_counter()
+            self._call(func)
+            stats.add(f"soon.{func_name(func)}", perf_counter() - t_start)
+        self._run_timers(self.state.t_abs)
         for func in self.funcs:
-            func()
+            t_start: float = perf_counter()
+            result = func()
+            if result is not None and isawaitable(result):
+                if iscoroutine(result):
+                    result.close()
+                raise TypeError(f"per-frame funcs cannot be coroutines: {func!r}")
+            stats.add(f"dispatch.{func_name(func)}", perf_counter() - t_start)
+        stats.add("dispatch", perf_counter() - t_dispatch)
         self.state.f += 1
         self.state.t_last_abs = self.state.t_abs
 
+        waiters, self._frame_waiters = self._frame_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
     def start(self):
         self.state.t_start_abs = monotonic()
         next_frame_time: float = self.state.t_start_abs
+        self.running = True
         while not self.stopped:
-            if self.max_fps is None:
-                self.dispatch()
+            self._wait(next_frame_time)
+            self.dispatch()
+            next_frame_time = self._next_frame(next_frame_time)
+        self.running = False
+
+    # idled or fell behind, skip the missed frames rather than running them in
+    # a burst
+    def _next_frame(self, next_frame_time: float) -> float:
+        if self.max_fps is None:
+            return next_frame_time
+
+        next_frame_time += 1 / self.max_fps
+        if next_frame_time < self.state.t_abs:
+            next_frame_time = self.state.t_abs + 1 / self.max_fps
+        return next_frame_time
+
+    # frames are only needed while something runs every frame or is pending;
+    # otherwise sleep until the next timer is due or input arrives
+    def _wait(self, next_frame_time: float):
+        while not self.stopped:
+            due: float | None
+            if self.funcs or self._soon:
+                due = next_frame_time
+            elif self.timers:
+                due = max(self.timers[0][0], next_frame_time)
             else:
-                current_time: float = monotonic()
-                if current_time < next_frame_time:
-                    sleep(next_frame_time - current_time)
+                due = None if self.readers else next_frame_time
+
+            now: float = monotonic()
+            if due is not None and now >= due:
+                return
+
+            timeout: float | None = None if due is None else due - now
+            if not self.readers:
+                sleep(timeout)
+                return
+
+            assert self._selector is not None
+            for key, _ in self._selector.select(timeout):
+                key.data()
+
+    # asyncio counterpart of start(), frames share the event loop with other tasks
+    async def run(self):
+        import asyncio
+
+        self.state.t_start_abs = monotonic()
+        next_frame_time: float = self.state.t_start_abs
+        self._tasks = set()
+        self.running = True
+        for fd, func in self.readers.items():
+            asyncio.get_running_loop().add_reader(fd, func)
+        try:
+            while not self.stopped:
+                if self.max_fps is None:
+                    # still give pending i/o a turn between frames
+                    await asyncio.sleep(0)
+                else:
+                    await asyncio.sleep(max(0, next_frame_time - monotonic()))
                 self.dispatch()
-                next_frame_time += 1 / self.max_fps
+                next_frame_time = self._next_frame(next_frame_time)
+        finally:
+            self.running = False
+            for fd in self.readers:
+                asyncio.get_running_loop().remove_reader(fd)
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = None
+            for waiter in self._frame_waiters:
+                waiter.cancel()
+            self._frame_waiters = []
+
+    def next_frame(self) -> Awaitable[None]:
+        import asyncio
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._frame_waiters.append(waiter)
+        return waiter
+
+    def sleep(self, seconds: float) -> Awaitable[None]:
+        import asyncio
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+        def wake():
+            if not waiter.done():
+                waiter.set_result(None)
+
+        timer: Timer = self.after(wake, seconds=seconds)
+        waiter.add_done_callback(lambda _: timer.cancel())
+        return waiter
 
     def stop(self):
         self.stopped = True
 
 
-L = Loop()
+# the global loop is made on first use of loop.L, not on import
+def __getattr__(name: str) -> object:
+    if name == "L":
+        global L
+        L = Loop()
+        return L
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
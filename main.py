@@ -1,11 +1,12 @@
 from enum import Enum
 from random import random
 
+from events import Event, Input, Key, Mouse, MouseAction
 from layout import Padding
 from loop import L
 from ref import Ref, RefFunc
-from term import go, lorem
-from term2 import Block, Color, Dim, Direction, Layout, Term, Text
+from term import BACKEND, go, lorem
+from term2 import Direction, Layout, ScrollList, Term
 
 
 def main():
@@ -80,15 +81,29 @@ def main():
     # with t(Block(border=False)):
     #     t(Text(text2))
 
-    with t(Block(layout=Layout(direction=Direction.Vertical, gap=1))):
-        for idx in range(T):
-            t(Text(f"{idx + 1}: "))
+    # one row per task, only the ones in view are rendered
+    statuses: Ref[tuple[Status, ...]] = Ref(getter=lambda: tuple(tasks))
+    rows: ScrollList[Status] = ScrollList(
+        statuses,
+        lambda idx, status: f"{idx + 1:>2}: {status:c}",
+        # follows the terminal as it is resized
+        height=Ref(getter=lambda: BACKEND.size().y - 4),
+    )
+    t(rows)
+
+    keys: Input = Input(L, mouse=True)
 
-    with t(Block(layout=Layout(direction=Direction.Vertical, gap=1))):
-        for idx in range(T):
-            t(Text(Ref(getter=(lambda idx_: lambda: format(tasks[idx_], "c"))(idx))))
+    @keys.on
+    def on_event(event: Event):
+        match event:
+            case Key("q") | Key("escape"):
+                L.stop()
+            case Key("up") | Mouse(action=MouseAction.Scroll, button=0):
+                rows.scroll(-1)
+            case Key("down") | Mouse(action=MouseAction.Scroll, button=1):
+                rows.scroll(1)
 
-    with go():
+    with go(), keys:
         L.start()
 
 
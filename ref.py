@@ -1,22 +1,69 @@
 from __future__ import annotations
 
-from typing import Callable, Generic, TypeVar
+from contextlib import contextmanager
+from time import monotonic
+from types import MethodType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    ClassVar,
+    Generic,
+    Iterable,
+    Iterator,
+    TypeVar,
+)
+from typing_extensions import override
+from weakref import WeakMethod, WeakSet
 
-from loop import L
+from loop import Func
+
+# concurrent.futures is slow to import, and only needed once an AsyncRef
+# refreshes
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
 
 T = TypeVar("T")
 U = TypeVar("U")
 
 
 class Ref(Generic[T]):
+    # getter refs without dependencies, sampled at most once per frame
+    POLLED: ClassVar[WeakSet[Ref]] = WeakSet()
+    # the frame in progress, within which a polled ref reads the same all
+    # frame long; None between frames, where every read samples afresh
+    FRAME: ClassVar[int | None] = None
+    N_FRAMES: ClassVar[int] = 0
+
     def __init__(
-        self, value: T | None = None, *, getter: Callable[[], T] | None = None
+        self,
+        value: T | None = None,
+        *,
+        getter: Callable[[], T] | None = None,
+        depends: Iterable[Ref] | None = None,
     ):
         if not ((value is None) ^ (getter is None)):
             raise ValueError("provide either value or getter")
 
+        if depends is not None and getter is None:
+            raise ValueError("depends requires getter")
+
         self._value: T | None = value
         self._get: Callable[[], T] | None = getter
+        self._derived: bool = depends is not None
+        self._stale: bool = True
+        self._frame: int | None = None
+
+        self._dependents: WeakSet[Ref] = WeakSet()
+        # bound methods are held weakly, so that a long-lived ref does not keep
+        # alive everything that ever displayed it
+        self._subscribers: list[Func | WeakMethod] = []
+
+        if depends is not None:
+            for ref in depends:
+                ref._dependents.add(self)
+
+        elif getter is not None:
+            Ref.POLLED.add(self)
 
     @property
     def value(self) -> T:
@@ -24,17 +71,95 @@ class Ref(Generic[T]):
             assert self._value is not None
             return self._value
 
+        elif self._derived:
+            if self._stale:
+                self._value = self._get()
+                self._stale = False
+            assert self._value is not None
+            return self._value
+
         else:
-            assert self._get is not None
-            return self._get()
+            if Ref.FRAME is None or self._frame != Ref.FRAME:
+                self._frame = Ref.FRAME
+                value: T = self._get()
+                if self._stale or value != self._value:
+                    self._value = value
+                    self._stale = False
+                    self._changed()
+            assert self._value is not None
+            return self._value
 
     def set_value(self, value: T):
         if self._get is None:
-            self._value = value
+            if value != self._value:
+                self._value = value
+                self._changed()
 
         else:
             raise Exception("cannot set value of getter ref")
 
+    # what poll() does for this ref
+    def _sample(self):
+        self.value
+
+    def subscribe(self, func: Func):
+        self._subscribers.append(
+            WeakMethod(func) if isinstance(func, MethodType) else func
+        )
+
+    def unsubscribe(self, func: Func):
+        self._subscribers = [
+            sub
+            for sub in self._subscribers
+            if sub is not func and not (isinstance(sub, WeakMethod) and sub() == func)
+        ]
+
+    def invalidate(self):
+        if self._derived and self._stale:
+            return
+
+        self._stale = True
+        self._changed()
+
+    def _changed(self):
+        for ref in list(self._dependents):
+            ref.invalidate()
+        dead: bool = False
+        for sub in self._subscribers:
+            func: Func | None = sub() if isinstance(sub, WeakMethod) else sub
+            if func is None:
+                dead = True
+            else:
+                func()
+        if dead:
+            self._subscribers = [
+                sub
+                for sub in self._subscribers
+                if not (isinstance(sub, WeakMethod) and sub() is None)
+            ]
+
+    # frames may nest, e.g. a render within a dispatch, and share the outermost
+    @staticmethod
+    @contextmanager
+    def frame() -> Iterator[None]:
+        if Ref.FRAME is not None:
+            yield
+            return
+
+        Ref.N_FRAMES += 1
+        Ref.FRAME = Ref.N_FRAMES
+        try:
+            yield
+        finally:
+            Ref.FRAME = None
+
+    # sample every polled ref, notifying the dependents of those that changed
+    @staticmethod
+    def poll():
+        with Ref.frame():
+            for ref in list(Ref.POLLED):
+                ref._sample()
+
     @staticmethod
     def dereference(value: T | Ref[T]) -> T:
         if isinstance(value, Ref):
@@ -52,6 +177,91 @@ class Ref(Generic[T]):
             return Ref(value)
 
 
+# shared by every AsyncRef, so the number of threads stays bounded however
+# many values are sampled
+WORKERS: int = 4
+_pool: ThreadPoolExecutor | None = None
+
+
+def pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="ref")
+    return _pool
+
+
+# stale-while-revalidate: reading returns the last completed value right away,
+# and if that is older than every seconds a refresh runs on the pool, one per
+# ref at a time, so a slow getter never holds up a frame
+class AsyncRef(Ref[T]):
+    def __init__(
+        self,
+        getter: Callable[[], T],
+        initial: T | None = None,
+        *,
+        every: float = 0.5,
+    ):
+        if every <= 0:
+            raise ValueError(f"every must > 0, got: {every}")
+
+        super().__init__(getter=getter)
+        self.every: float = every
+        # without an initial value the first read waits for the getter
+        self._value = initial
+        self._stale = initial is None
+        self._due: float = 0
+        self._future: Future[T] | None = None
+        # from the last refresh, kept until one succeeds
+        self.error: Exception | None = None
+
+    @property
+    @override
+    def value(self) -> T:
+        self._sample()
+        if self._stale:
+            if self._future is not None:
+                self._take(self._future)
+            # with nothing to fall back on, the error is all there is to give
+            if self._stale:
+                assert self.error is not None
+                raise self.error
+
+        return self._value  # type: ignore
+
+    # polling only starts refreshes and takes those that finished, so a ref
+    # that nothing displays, or that has yet to succeed, holds up no frame
+    @override
+    def _sample(self):
+        # finished refreshes are taken once per frame, like any polled ref
+        if Ref.FRAME is None or self._frame != Ref.FRAME:
+            self._frame = Ref.FRAME
+            if self._future is not None and self._future.done():
+                self._take(self._future)
+
+        if self._future is None and monotonic() >= self._due:
+            self._due = monotonic() + self.every
+            assert self._get is not None
+            self._future = pool().submit(self._get)
+
+    # a failed refresh keeps the last good value, and is retried on the usual
+    # cadence
+    def _take(self, future: Future[T]):
+        self._future = None
+        try:
+            value: T = future.result()
+        except Exception as e:
+            self.error = e
+            return
+
+        self.error = None
+        if self._stale or value != self._value:
+            self._value = value
+            self._stale = False
+            self._changed()
+
+
 class RefFunc(Generic[T]):
     def __init__(self, func: Callable[..., T]):
         self.func: Callable[..., T] = func
@@ -61,6 +271,9 @@ class RefFunc(Generic[T]):
             getter=lambda: self.func(
                 *map(Ref.dereference, args),
                 **{k: Ref.dereference(v) for k, v in kwargs.items()},
-            )
+            ),
+            depends=[
+                arg for arg in [*args, *kwargs.values()] if isinstance(arg, Ref)
+            ],
         )
         return ref
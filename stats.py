@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections import deque
+from functools import partial
+from math import ceil
+from typing import Iterator
+
+
+class Metric:
+    def __init__(self, window: int = 256):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count: int = 0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+
+    @property
+    def last(self) -> float:
+        return self.samples[-1] if self.samples else 0
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+    # nearest-rank percentile over the window, p in [0, 100]
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0
+
+        ordered: list[float] = sorted(self.samples)
+        return ordered[max(0, ceil(p / 100 * len(ordered)) - 1)]
+
+    def summary(self) -> dict[str, float]:
+        if not self.samples:
+            return {"count": self.count}
+
+        ordered: list[float] = sorted(self.samples)
+        at = lambda p: ordered[max(0, ceil(p / 100 * len(ordered)) - 1)]
+        return {
+            "count": self.count,
+            "last": self.samples[-1],
+            "mean": sum(ordered) / len(ordered),
+            "p50": at(50),
+            "p90": at(90),
+            "p99": at(99),
+            "max": ordered[-1],
+        }
+
+
+class Stats:
+    def __init__(self, window: int = 256):
+        self.window: int = window
+        self.metrics: dict[str, Metric] = {}
+
+    def __getitem__(self, name: str) -> Metric:
+        if name not in self.metrics:
+            self.metrics[name] = Metric(self.window)
+        return self.metrics[name]
+
+    def __iter__(self) -> Iterator[tuple[str, Metric]]:
+        yield from sorted(self.metrics.items())
+
+    def add(self, name: str, value: float):
+        self[name].add(value)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {name: metric.summary() for name, metric in self}
+
+    def clear(self):
+        self.metrics = {}
+
+
+# partials and callable instances have no name of their own, and their repr
+# has an address in it, which would make a new metric for every one of them
+def func_name(func: object) -> str:
+    if isinstance(func, partial):
+        return func_name(func.func)
+
+    return getattr(func, "__qualname__", None) or type(func).__qualname__
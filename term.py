@@ -1,50 +1,77 @@
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from array import array
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-import itertools
-from functools import cached_property
+from enum import IntFlag
+import io
 import os
-from random import choice, choices
-import string
+import shutil
+import signal
 import sys
-from time import sleep
-from typing import Iterator
-from operator import attrgetter
-
-from color import Color
-from lambdas import Lx
-
-lorem = " ".join(
-    [
-        "lorem ipsum dolor sit amet, consectetur adipiscing elit.",
-        "ut malesuada libero dui, non volutpat sapien sagittis vitae.",
-        "proin sodales laoreet orci, eu tincidunt nisi viverra ac.",
-        "donec consequat orci quis enim tristique vehicula.",
-        "fusce dignissim massa in mi pretium, non ornare turpis lobortis.",
-        "sed iaculis, turpis id sollicitudin vulputate, augue nunc elementum velit, a varius tortor nibh at ante.",
-        "in mattis, ante at congue venenatis, leo massa maximus lacus, et dignissim sapien orci sit amet tellus.",
-        "integer interdum posuere ex, et fermentum elit placerat eu.",
-        "vivamus nec nulla fringilla, dapibus tortor ac, egestas dui.",
-        "nullam non condimentum enim, in eleifend leo.",
-        "nam et bibendum nunc, vel rutrum sem.",
-        "mauris id sem est.",
-        "curabitur lacinia tempor nulla ut lobortis.",
-        "ut quam dui, vehicula et lacinia vitae, dignissim ac neque.",
-        "vestibulum ante ipsum primis in faucibus orci luctus et ultrices posuere cubilia curae;",
-        "sed et felis ut mauris consequat mollis quis ac lectus.",
-        "in in odio sodales justo vulputate sollicitudin ex.",
-    ]
+import threading
+from typing import Iterable, Iterator, NamedTuple
+from typing_extensions import override
+
+from color import Color, Depth
+from width import cells, char_width, columns, narrow, width
+
+LOREM: tuple[str, ...] = (
+    "lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+    "ut malesuada libero dui, non volutpat sapien sagittis vitae.",
+    "proin sodales laoreet orci, eu tincidunt nisi viverra ac.",
+    "donec consequat orci quis enim tristique vehicula.",
+    "fusce dignissim massa in mi pretium, non ornare turpis lobortis.",
+    "sed iaculis, turpis id sollicitudin vulputate, augue nunc elementum velit, a varius tortor nibh at ante.",
+    "in mattis, ante at congue venenatis, leo massa maximus lacus, et dignissim sapien orci sit amet tellus.",
+    "integer interdum posuere ex, et fermentum elit placerat eu.",
+    "vivamus nec nulla fringilla, dapibus tortor ac, egestas dui.",
+    "nullam non condimentum enim, in eleifend leo.",
+    "nam et bibendum nunc, vel rutrum sem.",
+    "mauris id sem est.",
+    "curabitur lacinia tempor nulla ut lobortis.",
+    "ut quam dui, vehicula et lacinia vitae, dignissim ac neque.",
+    "vestibulum ante ipsum primis in faucibus orci luctus et ultrices posuere cubilia curae;",
+    "sed et felis ut mauris consequat mollis quis ac lectus.",
+    "in in odio sodales justo vulputate sollicitudin ex.",
 )
 
-D = os.get_terminal_size()
-H, W = D.lines, D.columns
 
-buffer = [[" " for _ in range(W)] for __ in range(H)]
+# terminal state is made on first use rather than on import, so that importing
+# costs nothing and works without a tty; H and W follow the backend's size
+def __getattr__(name: str) -> object:
+    match name:
+        case "lorem":
+            global lorem
+            lorem = " ".join(LOREM)
+            return lorem
 
+        case "D":
+            return os.terminal_size(BACKEND.size())
 
-@dataclass(frozen=True)
-class Vec:
+        case "H":
+            return BACKEND.size().y
+
+        case "W":
+            return BACKEND.size().x
+
+        case "buffer":
+            global buffer
+            w, h = BACKEND.size()
+            buffer = [[" " for _ in range(w)] for __ in range(h)]
+            return buffer
+
+        case "DEFAULT_VIEW":
+            global DEFAULT_VIEW
+            DEFAULT_VIEW = View(Rect(Vec(0, 0), BACKEND.size()))
+            return DEFAULT_VIEW
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# tuples, so that the many made per frame are cheap to build and unpack
+class Vec(NamedTuple):
     x: int
     y: int
 
@@ -54,22 +81,19 @@ class Vec:
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
 
-    def __iter__(self) -> Iterator[int]:
-        return iter((self.x, self.y))
-
     def __neg__(self) -> Vec:
         return Vec(-self.x, -self.y)
 
-    def __add__(self, v: Vec) -> Vec:
+    def __add__(self, v: Vec) -> Vec:  # type: ignore[override]
         return Vec(self.x + v.x, self.y + v.y)
 
     def __sub__(self, v: Vec) -> Vec:
-        return self + (-v)
+        return Vec(self.x - v.x, self.y - v.y)
 
-    def __mul__(self, c: int) -> Vec:
+    def __mul__(self, c: int) -> Vec:  # type: ignore[override]
         return Vec(self.x * c, self.y * c)
 
-    def __rmul__(self, c: int) -> Vec:
+    def __rmul__(self, c: int) -> Vec:  # type: ignore[override]
         return self * c
 
     def __floordiv__(self, c: int) -> Vec:
@@ -83,31 +107,411 @@ def cursor_to(v: Vec) -> str:
     return f"\x1b[{v.y + 1};{v.x + 1}H"
 
 
-class ChangeBuffer:
+RESET = "\x1b[0m"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR = "\x1b[2J"
+# dec private mode 2026, the terminal holds off repainting until the end
+SYNC_BEGIN = "\x1b[?2026h"
+SYNC_END = "\x1b[?2026l"
+
+
+class Attr(IntFlag):
+    NONE = 0
+    BOLD = 1
+    DIM = 2
+    ITALIC = 4
+    UNDERLINE = 8
+    BLINK = 16
+    REVERSE = 32
+    STRIKE = 64
+
+
+# bold and dim share an off code
+ATTR_SGR: dict[Attr, tuple[str, str]] = {
+    Attr.BOLD: ("1", "22"),
+    Attr.DIM: ("2", "22"),
+    Attr.ITALIC: ("3", "23"),
+    Attr.UNDERLINE: ("4", "24"),
+    Attr.BLINK: ("5", "25"),
+    Attr.REVERSE: ("7", "27"),
+    Attr.STRIKE: ("9", "29"),
+}
+
+StyleKey = tuple[Color, Color, Attr]
+
+
+class StyleTable:
     def __init__(self):
-        self._data = {}
+        self.keys: list[StyleKey] = []
+        self.ids: dict[StyleKey, int] = {}
+        self.encoders: dict[Depth, StyleEncoder] = {}
+        # packed colour -> id, for each (bg, other colour, attrs) of a batch
+        self._packed: dict[tuple[bool, Color, Attr], dict[int, int]] = {}
+        self.id(Color.NONE, Color.NONE)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def id(
+        self,
+        fg: Color | None = None,
+        bg: Color | None = None,
+        attrs: Attr = Attr.NONE,
+    ) -> int:
+        key: StyleKey = (fg or Color.NONE, bg or Color.NONE, attrs)
+        id: int | None = self.ids.get(key)
+        if id is None:
+            id = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return id
+
+    # ids for a batch of packed 0xrrggbb colours, as foregrounds over bg or as
+    # backgrounds under fg, e.g. from color.gradient() or color.hsl_batch()
+    def batch(
+        self,
+        colors: Iterable[int],
+        *,
+        fg: Color | None = None,
+        bg: Color | None = None,
+        attrs: Attr = Attr.NONE,
+    ) -> array[int]:
+        if fg is not None and bg is not None:
+            raise ValueError("batch colours need either fg or bg free")
+
+        as_bg: bool = fg is not None
+        other: Color = fg or bg or Color.NONE
+        cache: dict[int, int] = self._packed.setdefault((as_bg, other, attrs), {})
+        out: array[int] = array("I")
+        for packed in colors:
+            id: int | None = cache.get(packed)
+            if id is None:
+                color: Color = Color.unpack(packed)
+                id = cache[packed] = (
+                    self.id(other, color, attrs)
+                    if as_bg
+                    else self.id(color, other, attrs)
+                )
+            out.append(id)
+        return out
+
+    def encoder(self, depth: Depth = Depth.TRUECOLOR) -> StyleEncoder:
+        if depth not in self.encoders:
+            self.encoders[depth] = StyleEncoder(self, depth)
+        return self.encoders[depth]
+
+    def sgr(self, id: int, depth: Depth = Depth.TRUECOLOR) -> str:
+        return self.encoder(depth).sgr(id)
+
+    def transition(self, src: int, dst: int, depth: Depth = Depth.TRUECOLOR) -> str:
+        return self.encoder(depth).transition(src, dst)
+
+
+# escapes for the styles of a table at one colour depth, built as styles are
+# first drawn so each colour is quantized once rather than once per cell
+class StyleEncoder:
+    def __init__(self, table: StyleTable, depth: Depth):
+        self.table: StyleTable = table
+        self.depth: Depth = depth
+        # absolute sequence for each style, starting from a reset
+        self._sgr: list[str] = []
+        self._transitions: list[dict[int, str]] = []
+
+    def sgr(self, id: int) -> str:
+        while len(self._sgr) <= id:
+            self._sgr.append(self._absolute(self.table.keys[len(self._sgr)]))
+            self._transitions.append({})
+        return self._sgr[id]
+
+    # shortest sequence that takes the pen from style src to style dst
+    def transition(self, src: int, dst: int) -> str:
+        try:
+            return self._transitions[src][dst]
+        except (IndexError, KeyError):
+            self.sgr(max(src, dst))
+            self._transitions[src][dst] = self._delta(src, dst)
+            return self._transitions[src][dst]
+
+    def _absolute(self, key: StyleKey) -> str:
+        fg, bg, attrs = key
+        params: list[str] = ["0"]
+        params.extend(on for attr, (on, _) in ATTR_SGR.items() if attr & attrs)
+        if fg != Color.NONE:
+            params.append(fg.sgr_at(self.depth))
+        if bg != Color.NONE:
+            params.append(bg.sgr_at(self.depth, True))
+        return f"\x1b[{';'.join(params)}m"
+
+    def _delta(self, src: int, dst: int) -> str:
+        if src == dst:
+            return ""
+
+        fg0, bg0, attrs0 = self.table.keys[src]
+        fg1, bg1, attrs1 = self.table.keys[dst]
+        params: list[str] = []
+
+        off: Attr = attrs0 & ~attrs1
+        on: Attr = attrs1 & ~attrs0
+        if off & (Attr.BOLD | Attr.DIM):
+            params.append("22")
+            on |= attrs1 & (Attr.BOLD | Attr.DIM)
+            off &= ~(Attr.BOLD | Attr.DIM)
+        params.extend(off_ for attr, (_, off_) in ATTR_SGR.items() if attr & off)
+        params.extend(on_ for attr, (on_, _) in ATTR_SGR.items() if attr & on)
+
+        # colours that quantize to the same escape need no change
+        sgr_fg: str = fg1.sgr_at(self.depth)
+        if fg0.sgr_at(self.depth) != sgr_fg:
+            params.append(sgr_fg)
+        sgr_bg: str = bg1.sgr_at(self.depth, True)
+        if bg0.sgr_at(self.depth, True) != sgr_bg:
+            params.append(sgr_bg)
+
+        if not params:
+            return ""
+
+        delta: str = f"\x1b[{';'.join(params)}m"
+        return min(delta, self._sgr[dst], key=len)
+
+
+STYLES = StyleTable()
+
+
+# width.cells() with a style per character carried along: a wide glyph's style
+# covers both its columns, and zero-width characters go with the glyph before
+def styled_cells(text: str, style: array[int]) -> tuple[list[str], array[int]]:
+    glyphs: list[str] = []
+    styles: array[int] = array("I")
+    for ch, s in zip(text, style):
+        match char_width(ch):
+            case 0:
+                if glyphs:
+                    last: int = len(glyphs) - 1 if glyphs[-1] else len(glyphs) - 2
+                    glyphs[last] += ch
+
+            case 1:
+                glyphs.append(ch)
+                styles.append(s)
+
+            case _:
+                glyphs += (ch, "")
+                styles += array("I", (s, s))
+    return glyphs, styles
+
+
+class Surface:
+    def __init__(self, w: int | None = None, h: int | None = None, *, fill=" "):
+        if w is None or h is None:
+            size: Vec = BACKEND.size()
+            w = size.x if w is None else w
+            h = size.y if h is None else h
+        self.w: int = w
+        self.h: int = h
+        self.fill: str | None = fill
+        self.glyphs: list[str | None] = [fill] * (self.w * self.h)
+        self.styles: array[int] = array("I", [0]) * (self.w * self.h)
+        self._fingerprints: list[int | None] = [None] * self.h
 
-    def __setitem__(self, v: Vec, value: str):
-        self._data[v] = value
+    @property
+    def dim(self) -> Vec:
+        return Vec(self.w, self.h)
 
-    def __iter__(self) -> Iterator[tuple[Vec, str]]:
-        yield from sorted(self._data.items(), key=lambda item: (item[0].y, item[0].x))
+    def __setitem__(self, v: Vec, ch: str):
+        if 0 <= v.x < self.w:
+            self.put(v.x, v.y, ch)
 
-    def render(self) -> str:
-        comps = []
-        pv = Vec(-1, -1)
-        for v, ch in self:
-            if v.y == pv.y and v.x == pv.x + 1:
-                comps.append(ch)
+    def __iter__(self) -> Iterator[tuple[Vec, str]]:
+        for y in range(self.h):
+            base: int = y * self.w
+            for x, ch in enumerate(self.glyphs[base : base + self.w]):
+                if ch is not None:
+                    yield Vec(x, y), ch
+
+    # style is one id for the whole run or an id per cell
+    def put(self, x: int, y: int, text: str, style: int | array[int] = 0):
+        # one cell, as when drawing character by character, needs no slicing
+        if len(text) == 1 and isinstance(style, int) and narrow(text):
+            if 0 <= x < self.w and 0 <= y < self.h:
+                i: int = y * self.w + x
+                self._split_wide(i, i + 1, y)
+                self.glyphs[i] = text
+                self.styles[i] = style
+                self._fingerprints[y] = None
+            return
+
+        if not narrow(text):
+            if isinstance(style, int):
+                self.put_cells(x, y, cells(text), style)
             else:
-                comps.append(f"{cursor_to(v)}{ch}")
-            pv = v
+                self.put_cells(x, y, *styled_cells(text, style))
+            return
+
+        if not 0 <= y < self.h or x >= self.w:
+            return
+
+        start: int = max(0, -x)
+        text = text[start : self.w - x]
+        x += start
+        if not text:
+            return
+
+        i: int = y * self.w + x
+        self._split_wide(i, i + len(text), y)
+        self.glyphs[i : i + len(text)] = text
+        if isinstance(style, int):
+            self.styles[i : i + len(text)] = array("I", [style]) * len(text)
+        else:
+            self.styles[i : i + len(text)] = style[start : start + len(text)]
+        self._fingerprints[y] = None
+
+    # one glyph per column as from width.cells(), "" for the right half of a
+    # wide glyph
+    def put_cells(
+        self, x: int, y: int, glyphs: list[str], style: int | array[int] = 0
+    ):
+        if not 0 <= y < self.h:
+            return
+
+        start: int = max(0, -x)
+        end: int = min(len(glyphs), self.w - x)
+        if start >= end:
+            return
+
+        row: list[str] = glyphs[start:end]
+        # wide glyphs cut by either edge become spaces
+        if row[0] == "":
+            row[0] = " "
+        if end < len(glyphs) and glyphs[end] == "":
+            row[-1] = " "
+
+        x += start
+        i: int = y * self.w + x
+        self._split_wide(i, i + len(row), y)
+        self.glyphs[i : i + len(row)] = row
+        if isinstance(style, int):
+            self.styles[i : i + len(row)] = array("I", [style]) * len(row)
+        else:
+            self.styles[i : i + len(row)] = style[start:end]
+        self._fingerprints[y] = None
+
+    # blank the other half of any wide glyph that a write to [i, j) cuts in two
+    def _split_wide(self, i: int, j: int, y: int):
+        if self.glyphs[i] == "" and i > y * self.w:
+            self.glyphs[i - 1] = " "
+        if j < (y + 1) * self.w and self.glyphs[j] == "":
+            self.glyphs[j] = " "
+
+    def fingerprint(self, y: int) -> int:
+        fingerprint: int | None = self._fingerprints[y]
+        if fingerprint is None:
+            base: int = y * self.w
+            fingerprint = hash(
+                (
+                    tuple(self.glyphs[base : base + self.w]),
+                    self.styles[base : base + self.w].tobytes(),
+                )
+            )
+            self._fingerprints[y] = fingerprint
+        return fingerprint
+
+    def diff(
+        self, front: Surface | None = None, *, depth: Depth = Depth.TRUECOLOR
+    ) -> str:
+        comps: list[str] = []
+        self.diff_into(comps, front, depth=depth)
+        return "".join(comps)
+
+    # append the escapes that turn front into self, or draw all of self
+    def diff_into(
+        self,
+        comps: list[str],
+        front: Surface | None = None,
+        *,
+        depth: Depth = Depth.TRUECOLOR,
+    ):
+        if front is not None and front.dim != self.dim:
+            raise ValueError(f"cannot diff {self.dim} against {front.dim}")
+
+        transition = STYLES.encoder(depth).transition
+        # pen starts and ends each diff at the default style
+        pen: int = 0
+        for y in range(self.h):
+            base: int = y * self.w
+            lim: int = base + self.w
+            glyphs: list[str | None] = self.glyphs[base:lim]
+            styles: array[int] = self.styles[base:lim]
+            if self.fill is None and glyphs.count(None) == self.w:
+                continue
+
+            front_glyphs: list[str | None] | None = None
+            front_styles: array[int] | None = None
+            if front is not None:
+                front_glyphs = front.glyphs[base:lim]
+                front_styles = front.styles[base:lim]
+                if (
+                    front.fingerprint(y) == self.fingerprint(y)
+                    and front_glyphs == glyphs
+                    and front_styles == styles
+                ):
+                    continue
+
+            next_x: int = -1
+            for x, ch in enumerate(glyphs):
+                if not ch:
+                    # the right half of a wide glyph, drawn with its left half
+                    if ch == "" and x == next_x:
+                        next_x += 1
+                    continue
+
+                if (
+                    front_glyphs is not None
+                    and front_styles is not None
+                    and ch == front_glyphs[x]
+                    and styles[x] == front_styles[x]
+                ):
+                    continue
+
+                if x != next_x:
+                    comps.append(cursor_to(Vec(x, y)))
+                if styles[x] != pen:
+                    comps.append(transition(pen, styles[x]))
+                    pen = styles[x]
+                comps.append(ch)
+                next_x = x + 1
 
-        s = "".join(comps)
-        return s if s.endswith(RESET) else f"{s}{RESET}"
+        if pen != 0:
+            comps.append(transition(pen, 0))
+
+    # reset cells by flat index, start inclusive and end exclusive
+    def erase(self, start: int, end: int):
+        start, end = max(0, start), min(self.w * self.h, end)
+        if start >= end:
+            return
+
+        self.glyphs[start:end] = [self.fill] * (end - start)
+        self.styles[start:end] = array("I", [0]) * (end - start)
+        for y in range(start // self.w, (end - 1) // self.w + 1):
+            self._fingerprints[y] = None
+
+    def scroll(self):
+        self.glyphs[: -self.w] = self.glyphs[self.w :]
+        self.styles[: -self.w] = self.styles[self.w :]
+        self._fingerprints[:-1] = self._fingerprints[1:]
+        self.erase((self.h - 1) * self.w, self.h * self.w)
 
     def clear(self):
-        self._data = {}
+        self.glyphs[:] = [self.fill] * (self.w * self.h)
+        self.styles[:] = array("I", [0]) * (self.w * self.h)
+        self._fingerprints[:] = [None] * self.h
+
+
+class ChangeBuffer(Surface):
+    def __init__(self, w: int | None = None, h: int | None = None):
+        super().__init__(w, h, fill=None)
+
+    def render(self, depth: Depth = Depth.TRUECOLOR) -> str:
+        s = self.diff(depth=depth)
+        return s if not s or s.endswith(RESET) else f"{s}{RESET}"
 
 
 class Buffer:
@@ -116,39 +520,36 @@ class Buffer:
 
     # todo: nomenclature
     def add(self, x: int, y: int, span: Span):
-        for dx, ch in enumerate(span.text):
-            self.buf[Vec(x + dx, y)] = span.style.decorate(ch)
+        self.buf.put(x, y, span.text, span.style.id)
 
     def draw(self):
-        w(self.buf.render())
-        f()
+        present(BACKEND, self.buf.render(BACKEND.depth))
         self.buf.clear()
 
 
-@dataclass(frozen=True)
-class Rect:
+class Rect(NamedTuple):
     pos: Vec
     dim: Vec
 
-    @cached_property
+    @property
     def lim(self) -> Vec:
-        return self.pos + self.dim
+        return Vec(self.pos.x + self.dim.x, self.pos.y + self.dim.y)
 
-    @cached_property
+    @property
     def tl(self) -> Vec:
         return self.pos
 
-    @cached_property
+    @property
     def tr(self) -> Vec:
-        return self.pos + Vec(self.dim.x - 1, 0)
+        return Vec(self.pos.x + self.dim.x - 1, self.pos.y)
 
-    @cached_property
+    @property
     def bl(self) -> Vec:
-        return self.pos + Vec(0, self.dim.y - 1)
+        return Vec(self.pos.x, self.pos.y + self.dim.y - 1)
 
-    @cached_property
+    @property
     def br(self) -> Vec:
-        return self.pos + Vec(self.dim.x - 1, self.dim.y - 1)
+        return Vec(self.pos.x + self.dim.x - 1, self.pos.y + self.dim.y - 1)
 
     @staticmethod
     def from_lim(pos: Vec, lim: Vec) -> Rect:
@@ -160,22 +561,26 @@ class Rect:
     def __bool__(self) -> bool:
         return self.dim.x > 0 and self.dim.y > 0
 
-    def __add__(self, off: Vec) -> Rect:
+    def __add__(self, off: Vec) -> Rect:  # type: ignore[override]
         return Rect(self.pos + off, self.dim)
 
     def __sub__(self, off: Vec) -> Rect:
-        return self + (-off)
+        return Rect(self.pos - off, self.dim)
 
     def __matmul__(self, pos: Vec) -> Rect:
         return Rect(pos, self.dim)
 
-    def __contains__(self, v: Vec) -> bool:
-        return self.pos.x <= v.x < self.lim.x and self.pos.y <= v.y < self.lim.y
+    def __contains__(self, v: Vec) -> bool:  # type: ignore[override]
+        x, y = self.pos
+        w, h = self.dim
+        return x <= v.x < x + w and y <= v.y < y + h
 
     def __and__(self, rect: Rect) -> Rect:
-        return Rect.from_lim(
-            Vec(max(self.pos.x, rect.pos.x), max(self.pos.y, rect.pos.y)),
-            Vec(min(self.lim.x, rect.lim.x), min(self.lim.y, rect.lim.y)),
+        (x0, y0), (w0, h0) = self
+        (x1, y1), (w1, h1) = rect
+        x, y = max(x0, x1), max(y0, y1)
+        return Rect(
+            Vec(x, y), Vec(min(x0 + w0, x1 + w1) - x, min(y0 + h0, y1 + h1) - y)
         )
 
 
@@ -186,25 +591,19 @@ class Renderable:
         raise NotImplementedError
 
 
-@dataclass(frozen=True)
-class Span(Renderable):
-    @dataclass
+# not a Renderable subclass only because tuples cannot have other bases
+class Span(NamedTuple):
+    @dataclass(frozen=True)
     class Style:
         fg: Color | None = None
         bg: Color | None = None
-
-        _decorator: str = field(init=False)
+        attrs: Attr = Attr.NONE
+        # looked up as it is made: styles are often made per cell and used
+        # once, where a cached_property would cost more than the lookup
+        id: int = field(init=False, repr=False, compare=False)
 
         def __post_init__(self):
-            comps: list[str] = []
-
-            if self.fg:
-                comps.append(self.fg.ansi_fg)
-
-            if self.bg:
-                comps.append(self.bg.ansi_bg)
-
-            self._decorator = "".join(comps)
+            object.__setattr__(self, "id", STYLES.id(self.fg, self.bg, self.attrs))
 
         def __repr__(self) -> str:
             comps: list[str] = []
@@ -215,24 +614,28 @@ class Span(Renderable):
             if self.bg:
                 comps.append(f"bg={self.bg}")
 
+            if self.attrs:
+                comps.append(f"attrs={self.attrs!r}")
+
             return f"Span.Style({', '.join(comps)})"
 
         def decorate(self, s: str) -> str:
-            return f"{self._decorator}{s}"
+            return f"{STYLES.sgr(self.id)}{s}"
 
     pos: Vec
     text: str
-    style: Style = field(default_factory=Style)
+    # shared, so that its style id is only looked up once
+    style: Style = Style()
 
     def __str__(self) -> str:
         comps: list[str] = [f"{self.text}", str(self.style)]
         return f"Span({', '.join(comps)}) @ {self.pos}"
 
-    def __add__(self, off: Vec) -> Span:
+    def __add__(self, off: Vec) -> Span:  # type: ignore[override]
         return Span(self.pos + off, self.text, self.style)
 
     def __sub__(self, off: Vec) -> Span:
-        return self + (-off)
+        return Span(self.pos - off, self.text, self.style)
 
     def __matmul__(self, pos: Vec) -> Span:
         return Span(pos, self.text, self.style)
@@ -241,9 +644,9 @@ class Span(Renderable):
     def spans(self) -> Iterator[Span]:
         yield self
 
-    @cached_property
+    @property
     def rect(self) -> Rect:
-        return Rect(self.pos, Vec(len(self.text), 1))
+        return Rect(self.pos, Vec(width(self.text), 1))
 
 
 class View:
@@ -260,33 +663,24 @@ class View:
             raise ValueError(f"{self} does not fit in {rect}")
 
         x, y = self.rect.pos
-        x = min(x, rect.lim.x - self.rect.lim.x)
+        x = min(x, rect.lim.x - self.rect.dim.x)
         x = max(x, rect.pos.x)
-        y = min(y, rect.lim.y - self.rect.lim.y)
+        y = min(y, rect.lim.y - self.rect.dim.y)
         y = max(y, rect.pos.y)
 
         self.rect @= Vec(x, y)
 
-    def clip(self, span: Span) -> Span | None:
-        if not (span.rect & self.rect):
+    # span cut to the view, then moved by off, built once either way
+    def clip(self, span: Span, off: Vec = Vec(0, 0)) -> Span | None:
+        (vx, vy), (vw, vh) = self.rect
+        (x, y), text = span.pos, span.text
+        n: int = width(text)
+        if not (n and vy <= y < vy + vh and x < vx + vw and x + n > vx):
             return None
 
-        if self.rect.pos.x > span.pos.x:
-            return Span(
-                Vec(self.rect.pos.x, span.pos.y),
-                span.text[self.rect.pos.x - span.pos.x :],
-                style=span.style,
-            )
-
-        else:
-            return Span(
-                span.pos, span.text[: self.rect.lim.x - span.pos.x], style=span.style
-            )
-
-
-DEFAULT_VIEW = View(
-    Rect(Vec(0, 0), Vec(*attrgetter("columns", "lines")(os.get_terminal_size())))
-)
+        text = columns(text, vx - x, vx + vw - x)
+        x = max(x, vx)
+        return Span(Vec(x + off.x, y + off.y), text, span.style)
 
 
 class Box(Renderable):
@@ -302,9 +696,9 @@ class Box(Renderable):
     def spans(self) -> Iterator[Span]:
         for renderable in self.children:
             for span in renderable.spans:
-                clipped = self.view.clip(span)
+                clipped = self.view.clip(span, self.rect.pos)
                 if clipped is not None:
-                    yield clipped + self.rect.pos
+                    yield clipped
 
 
 class Label(Renderable):
@@ -363,48 +757,220 @@ class Block(Renderable):
         yield from self.box.spans
 
 
+class Backend(ABC):
+    # whether to wrap frames in SYNC_BEGIN and SYNC_END
+    sync: bool = False
+    # colours are downsampled to what the terminal can show
+    depth: Depth = Depth.TRUECOLOR
+    # bytes written so far
+    n_bytes: int = 0
+
+    @abstractmethod
+    def size(self) -> Vec:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write(self, s: str):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+# COLORTERM for truecolour, then the terminfo name; without a TERM at all
+# there is nothing to go on, so keep truecolour
+def detect_depth() -> Depth:
+    colorterm: str = os.environ.get("COLORTERM", "").lower()
+    term: str = os.environ.get("TERM", "").lower()
+    if colorterm in ("truecolor", "24bit"):
+        return Depth.TRUECOLOR
+
+    elif "256color" in term:
+        return Depth.XTERM256
+
+    elif term in ("", "xterm-kitty", "xterm-ghostty", "alacritty", "wezterm"):
+        return Depth.TRUECOLOR
+
+    else:
+        return Depth.SYSTEM16
+
+
+class TtyBackend(Backend):
+    def __init__(self, *, sync: bool | None = None, depth: Depth | None = None):
+        # terminals without mode 2026 ignore it, so only skip it on dumb ones
+        self.sync: bool = os.environ.get("TERM") != "dumb" if sync is None else sync
+        self.depth: Depth = detect_depth() if depth is None else depth
+
+        # the size as of the last SIGWINCH, None until queried again
+        self._size: Vec | None = None
+        self._watching: bool = False
+        # how many times the terminal has been resized
+        self.resizes: int = 0
+
+    # queried at most once per resize: the handler only drops the cached size,
+    # so a storm of signals between two frames costs a single query
+    @override
+    def size(self) -> Vec:
+        if self._size is None:
+            self._watch()
+            D = shutil.get_terminal_size()
+            size: Vec = Vec(D.columns, D.lines)
+            # without a handler the size could change under us unnoticed
+            if not self._watching:
+                return size
+            self._size = size
+        return self._size
+
+    def _watch(self):
+        if self._watching or not hasattr(signal, "SIGWINCH"):
+            return
+
+        # handlers can only be set from the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def on_resize(signum: int, frame: object):
+            self._size = None
+            self.resizes += 1
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(signal.SIGWINCH, on_resize)
+        self._watching = True
+
+    # looked up on every call so redirect_stdout() applies
+    @override
+    def write(self, s: str):
+        try:
+            fd: int = sys.stdout.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            sys.stdout.write(s)
+            self.n_bytes += len(s.encode(sys.stdout.encoding or "utf-8", "replace"))
+            return
+
+        # one write(2) for the whole frame rather than one per buffer-full
+        sys.stdout.flush()
+        data: memoryview = memoryview(
+            s.encode(sys.stdout.encoding or "utf-8", "replace")
+        )
+        self.n_bytes += len(data)
+        while data:
+            data = data[os.write(fd, data) :]
+
+    @override
+    def flush(self):
+        sys.stdout.flush()
+
+
+class MemoryBackend(Backend):
+    def __init__(
+        self,
+        w: int = 80,
+        h: int = 24,
+        *,
+        keep: bool = True,
+        depth: Depth = Depth.TRUECOLOR,
+    ):
+        self.dim: Vec = Vec(w, h)
+        self.depth: Depth = depth
+        # whether to keep what is written, rather than only count it
+        self.keep: bool = keep
+        self.chunks: list[str] = []
+        self.n_bytes: int = 0
+        self.n_writes: int = 0
+
+    @override
+    def size(self) -> Vec:
+        return self.dim
+
+    @override
+    def write(self, s: str):
+        if self.keep:
+            self.chunks.append(s)
+        self.n_bytes += len(s.encode())
+        self.n_writes += 1
+
+    def getvalue(self) -> str:
+        return "".join(self.chunks)
+
+    def clear(self):
+        self.chunks = []
+
+
+BACKEND: Backend = TtyBackend()
+
+
+def set_backend(backend: Backend):
+    global BACKEND
+    BACKEND = backend
+
+
 class Screen:
-    def __init__(self, box: Box = Box(DEFAULT_VIEW.rect), view: View = DEFAULT_VIEW):
-        self.box = box
-        self.view = view
+    def __init__(
+        self,
+        box: Box | None = None,
+        view: View | None = None,
+        *,
+        backend: Backend | None = None,
+    ):
+        # None for whatever BACKEND is at draw time
+        self.backend: Backend | None = backend
+        # without a box, the screen's box follows the size of the terminal
+        self.fit: bool = box is None
+        self.box = box or Box(Rect(Vec(0, 0), (backend or BACKEND).size()))
+        self.view = view or View(self.box.rect)
 
     def draw(self):
-        buf = ChangeBuffer()
+        backend: Backend = self.backend or BACKEND
+        size: Vec = backend.size()
+        if self.fit and self.box.rect.dim != size:
+            self.box.rect = Rect(Vec(0, 0), size)
+            self.box.view = View(Rect(Vec(0, 0), size))
+            self.view = View(self.box.rect)
+
+        buf = ChangeBuffer(*size)
         for span in self.box.spans:
-            for dx, ch in enumerate(span.text):
-                buf[span.pos + Vec(dx, 0)] = span.style.decorate(ch)
+            buf.put(span.pos.x, span.pos.y, span.text, span.style.id)
+
+        present(backend, buf.render(backend.depth))
 
-        w(buf.render())
-        f()
 
+def w(s: str):
+    BACKEND.write(s)
 
-w = sys.stdout.write
-f = sys.stdout.flush
+
+def f():
+    BACKEND.flush()
 
 
 @contextmanager
-def new_buffer():
-    buffer = ChangeBuffer()
+def new_buffer(backend: Backend | None = None):
+    backend = backend or BACKEND
+    buffer = ChangeBuffer(*backend.size())
     yield buffer
-    w(buffer.render())
-    f()
+    present(backend, buffer.render(backend.depth))
 
 
-RESET = "\x1b[0m"
-HIDE_CURSOR = "\x1b[?25l"
-SHOW_CURSOR = "\x1b[?25h"
+def present(backend: Backend, s: str):
+    if not s:
+        return
+
+    backend.write(f"{SYNC_BEGIN}{s}{SYNC_END}" if backend.sync else s)
+    backend.flush()
 
 
 def setup():
     w(HIDE_CURSOR)
-    for _ in range(H - 1):
+    for _ in range(BACKEND.size().y - 1):
         w("\n")
     w(cursor_to(Vec(0, 0)))
     f()
 
 
 def teardown():
-    w(cursor_to(DEFAULT_VIEW.rect.lim - Vec(0, 2)))
+    w(cursor_to(BACKEND.size() - Vec(0, 2)))
     w("\n")
     w(SHOW_CURSOR)
     f()
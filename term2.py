@@ -1,20 +1,46 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from bisect import bisect_right
 from color import Color
 from contextlib import contextmanager
-from copy import deepcopy
-from dataclasses import dataclass, field
-from layout import Box, Dim, Direction, Fixed, Layout, LayoutInfo, Padding, Sizing
-import os
-from random import random
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from layout import Dim, Direction, Fixed, Layout, Padding, Sizing
+import itertools
+from time import perf_counter
 import re
-from types import TracebackType
-from typing import ContextManager, Iterator
+from typing import (
+    Callable,
+    ContextManager,
+    Generic,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+)
 from typing_extensions import override
+import weakref
 
+import loop
 from ref import Ref
-from term import H, Vec, W, cursor_to, f, w
+from stats import Stats
+import term
+from term import (
+    CLEAR,
+    STYLES,
+    SYNC_BEGIN,
+    SYNC_END,
+    Attr,
+    Backend,
+    Rect,
+    Surface,
+    Vec,
+    View,
+)
+from width import columns, narrow, width
 
 
 class Renderable(ABC):
@@ -23,10 +49,30 @@ class Renderable(ABC):
     def __init__(self):
         self.id: int = Renderable.NEXT_ID
         Renderable.NEXT_ID += 1
+        self.parent: Renderable | None = None
+        # needs size() and place() before the next render()
+        self.dirty: bool = True
+        # bumped whenever what render() yields may have changed
+        self.version: int = 0
 
     def add(self, thing: Renderable):
         pass
 
+    # told when a child goes from clean to dirty
+    def child_dirty(self, thing: Renderable):
+        pass
+
+    def mark_dirty(self):
+        self.version += 1
+        # ancestors of a dirty node are always dirty
+        node: Renderable = self
+        while not node.dirty:
+            node.dirty = True
+            if node.parent is None:
+                break
+            node.parent.child_dirty(node)
+            node = node.parent
+
     @abstractmethod
     def size(self, render_table: RenderTable):
         raise NotImplementedError
@@ -39,40 +85,168 @@ class Renderable(ABC):
     def render(self, render_table: RenderTable) -> Iterator[Span]:
         raise NotImplementedError
 
+    # runs in absolute coordinates, given where this was placed, cut to clip
+    def draw(
+        self, render_table: RenderTable, origin: Vec, clip: Rect
+    ) -> Iterator[Run]:
+        return clip_spans(RENDER_CACHE.spans(self, render_table), origin, clip)
+
+
+# spans from render() of each renderable, replayed until its id, dim or
+# version change; least recently drawn entries go first past max_cells
+class RenderCache:
+    def __init__(self, max_cells: int = 1 << 20):
+        self.max_cells: int = max_cells
+        self.entries: OrderedDict[int, tuple[int, int, int, list[Span], int]] = (
+            OrderedDict()
+        )
+        self.n_cells: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
 
-@dataclass
-class RenderInfo:
-    pos: Vec = field(default_factory=lambda: Vec(0, 0))
-    dim: Dim = field(default_factory=lambda: Dim(0, 0))
-
-
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def spans(self, thing: Renderable, render_table: RenderTable) -> list[Span]:
+        slot: int = render_table.slot(thing)
+        w: int = render_table.w[slot]
+        h: int = render_table.h[slot]
+        entry = self.entries.get(thing.id)
+        if entry is not None and entry[:3] == (thing.version, w, h):
+            self.entries.move_to_end(thing.id)
+            self.hits += 1
+            return entry[3]
+
+        self.misses += 1
+        spans: list[Span] = list(thing.render(render_table))
+        n_cells: int = sum(len(span.text) for span in spans)
+        self.invalidate(thing)
+        self.entries[thing.id] = (thing.version, w, h, spans, n_cells)
+        self.n_cells += n_cells
+        while self.n_cells > self.max_cells and len(self.entries) > 1:
+            _, (*_, evicted) = self.entries.popitem(last=False)
+            self.n_cells -= evicted
+        return spans
+
+    def invalidate(self, thing: Renderable):
+        entry = self.entries.pop(thing.id, None)
+        if entry is not None:
+            self.n_cells -= entry[4]
+
+    def clear(self):
+        self.entries.clear()
+        self.n_cells = 0
+
+
+RENDER_CACHE = RenderCache()
+
+
+# a span as drawn into a surface: x, y, text and style, with no Span or Vec
+# built for it since one is drawn for every span of every frame
+Run = tuple[int, int, str, "Style"]
+
+
+def clip_spans(spans: Iterable[Span], origin: Vec, clip: Rect) -> Iterator[Run]:
+    (ox, oy), (x0, y0), (w, h) = origin, clip.pos, clip.dim
+    x1, y1 = x0 + w, y0 + h
+    for span in spans:
+        x: int = span.pos.x + ox
+        y: int = span.pos.y + oy
+        text: str = span.text
+        n: int = len(text) if narrow(text) else width(text)
+        if not y0 <= y < y1 or x >= x1 or x + n <= x0:
+            continue
+
+        if x < x0 or x + n > x1:
+            text = columns(text, x0 - x, x1 - x)
+            x = max(x, x0)
+        yield x, y, text, span.style
+
+
+# layout results for every node, persisting across frames: pos and dim live
+# in flat arrays indexed by a dense slot per node, and the slots of nodes
+# that have been garbage collected are handed out again
 class RenderTable:
     def __init__(self):
-        self.table: dict[int, RenderInfo] = {}
+        self.slots: dict[int, int] = {}
+        self.free: list[int] = []
+        self.x: array[int] = array("i")
+        self.y: array[int] = array("i")
+        self.w: array[int] = array("i")
+        self.h: array[int] = array("i")
 
     def __contains__(self, thing: Renderable) -> bool:
-        return thing.id in self.table
-
-    def __getitem__(self, thing: Renderable) -> RenderInfo:
-        if thing not in self:
-            self.table[thing.id] = RenderInfo()
-        return self.table[thing.id]
-
-    def __setitem__(self, thing: Renderable, render_info: RenderInfo):
-        self.table[thing.id] = render_info
+        return thing.id in self.slots
 
-
-@dataclass
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def slot(self, thing: Renderable) -> int:
+        slot: int | None = self.slots.get(thing.id)
+        if slot is not None:
+            return slot
+
+        if self.free:
+            slot = self.free.pop()
+            self.x[slot] = self.y[slot] = self.w[slot] = self.h[slot] = 0
+        else:
+            slot = len(self.x)
+            for column in (self.x, self.y, self.w, self.h):
+                column.append(0)
+        self.slots[thing.id] = slot
+        weakref.finalize(thing, self._release, thing.id)
+        return slot
+
+    def _release(self, id: int):
+        slot: int | None = self.slots.pop(id, None)
+        if slot is not None:
+            self.free.append(slot)
+
+    def pos(self, thing: Renderable) -> Vec:
+        slot: int = self.slot(thing)
+        return Vec(self.x[slot], self.y[slot])
+
+    def dim(self, thing: Renderable) -> Dim:
+        slot: int = self.slot(thing)
+        return Dim(self.w[slot], self.h[slot])
+
+    def set_pos(self, thing: Renderable, x: int, y: int):
+        slot: int = self.slot(thing)
+        self.x[slot] = x
+        self.y[slot] = y
+
+    def set_dim(self, thing: Renderable, w: int, h: int):
+        slot: int = self.slot(thing)
+        self.w[slot] = max(0, w)
+        self.h[slot] = max(0, h)
+
+
+@dataclass(frozen=True)
 class Style:
     fg_color: Color = Color.NONE
     bg_color: Color = Color.NONE
+    attrs: Attr = Attr.NONE
+
+    @cached_property
+    def id(self) -> int:
+        return STYLES.id(self.fg_color, self.bg_color, self.attrs)
+
+    # interned, so that each distinct style resolves its id once
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def of(
+        fg_color: Color = Color.NONE,
+        bg_color: Color = Color.NONE,
+        attrs: Attr = Attr.NONE,
+    ) -> Style:
+        return Style(fg_color, bg_color, attrs)
 
 
-@dataclass
+@dataclass(slots=True)
 class Span:
     pos: Vec
     text: str
-    style: Style = field(default_factory=Style)
+    style: Style = Style.of()
 
     def __add__(self, off: Vec) -> Span:
         return Span(self.pos + off, self.text, self.style)
@@ -85,11 +259,36 @@ class Block(Renderable):
         super().__init__()
         self.layout: Layout = layout or Layout()
         self.border: bool = border
-        self.contents: list[Renderable] = list(contents)
+        self.contents: list[Renderable] = []
+        # index in contents by id
+        self._index: dict[int, int] = {}
+        # children to size and place before the next render
+        self._dirty: list[Renderable] = []
+        # children from this index on need placing again, None when none do
+        self._moved: int | None = 0
+        for thing in contents:
+            self.add(thing)
 
     @override
     def add(self, thing: Renderable):
+        self._index[thing.id] = len(self.contents)
         self.contents.append(thing)
+        thing.parent = self
+        if thing.dirty:
+            self._dirty.append(thing)
+        self._moved = len(self.contents) - 1 if self._moved is None else self._moved
+        super().mark_dirty()
+
+    # the block itself changed, e.g. its layout, so all of it is laid out again;
+    # a dirty child comes through child_dirty instead
+    @override
+    def mark_dirty(self):
+        self._moved = 0
+        super().mark_dirty()
+
+    @override
+    def child_dirty(self, thing: Renderable):
+        self._dirty.append(thing)
 
     def __iter__(self) -> Iterator[Renderable]:
         yield from self.contents
@@ -99,108 +298,166 @@ class Block(Renderable):
 
     @override
     def size(self, render_table: RenderTable):
-        for thing in self:
+        if not self.dirty:
+            return
+
+        # a child that keeps its dim leaves its siblings where they are, which is
+        # the common case of text changing in place
+        ws, hs = render_table.w, render_table.h
+        moved: int | None = self._moved
+        for thing in self._dirty:
+            slot: int = render_table.slot(thing)
+            w, h = ws[slot], hs[slot]
             thing.size(render_table)
-        proxy_layout: Layout = deepcopy(self.layout)
-        if self.border:
-            proxy_layout.padding.top += 1
-            proxy_layout.padding.right += 1
-            proxy_layout.padding.bottom += 1
-            proxy_layout.padding.left += 1
-        render_table[self].dim = proxy_layout.size(self.contents, render_table)
-
-        # if self.border:
-        #     render_table[self].dim.w += 2
-        #     render_table[self].dim.h += 2
+            if ws[slot] != w or hs[slot] != h:
+                idx: int = self._index[thing.id]
+                moved = idx if moved is None else min(moved, idx)
+        if moved is not None:
+            render_table.set_dim(
+                self,
+                *self.layout.size(self.contents, render_table, inset=int(self.border)),
+            )
+        self._moved = moved
 
     @override
     def place(self, render_table: RenderTable):
-        for thing in self:
-            thing.place(render_table)
-        proxy_layout: Layout = deepcopy(self.layout)
-        if self.border:
-            proxy_layout.padding.top += 1
-            proxy_layout.padding.right += 1
-            proxy_layout.padding.bottom += 1
-            proxy_layout.padding.left += 1
-        proxy_layout.place(self.contents, render_table)
-
-        # if self.border:
-        #     for thing in self:
-        #         render_table[thing].pos += Vec(1, 1)
+        if not self.dirty:
+            return
+
+        for thing in self._dirty:
+            if thing.dirty:
+                thing.place(render_table)
+        self._dirty.clear()
+        if self._moved is not None:
+            self.layout.place(
+                self.contents, render_table, inset=int(self.border), start=self._moved
+            )
+            self._moved = None
+        self.dirty = False
 
     @override
     def render(self, render_table: RenderTable) -> Iterator[Span]:
-        proxy_padding: Padding = deepcopy(self.layout.padding)
-
+        dim: Dim = render_table.dim(self)
+        for x, y, text, style in self.draw(
+            render_table, Vec(0, 0), Rect(Vec(0, 0), Vec(*dim))
+        ):
+            yield Span(Vec(x, y), text, style)
+
+    # children are drawn straight into absolute coordinates under a clip rect
+    # narrowed at each level, and those entirely outside it are never rendered
+    @override
+    def draw(
+        self, render_table: RenderTable, origin: Vec, clip: Rect
+    ) -> Iterator[Run]:
+        slot = render_table.slot
+        xs, ys, ws, hs = render_table.x, render_table.y, render_table.w, render_table.h
+        w, h = ws[slot(self)], hs[slot(self)]
         if self.border:
-            match render_table[self].dim:
-                case Dim(0, _) | Dim(_, 0):
-                    pass
-
-                case Dim(1, 1):
-                    yield Span(Vec(0, 0), "·")
-
-                case Dim(w, 1):
-                    yield Span(Vec(0, 0), "─" * w)
-
-                case Dim(1, h):
-                    for dy in range(h):
-                        yield Span(Vec(0, dy), "│")
-
-                case Dim(w, h):
-                    yield Span(Vec(0, 0), "".join(["┌", "─" * (w - 2), "┐"]))
-                    for dy in range(1, h - 1):
-                        yield Span(Vec(0, dy), "│")
-                        yield Span(Vec(w - 1, dy), "│")
-                    yield Span(Vec(0, h - 1), "".join(["└", "─" * (w - 2), "┘"]))
-
-            proxy_padding.top += 1
-            proxy_padding.right += 1
-            proxy_padding.bottom += 1
-            proxy_padding.left += 1
-
-        for thing in self.contents:
-            for span in thing.render(render_table):
-                span += render_table[thing].pos
-
-                # clip
-                # todo: this is incredibly disgusting
-                if span.pos.x >= render_table[self].dim.w - proxy_padding.right:
-                    continue
-
-                if span.pos.y >= render_table[self].dim.h - proxy_padding.bottom:
-                    continue
-
-                if span.pos.y < proxy_padding.top:
-                    continue
-
-                if span.pos.x <= proxy_padding.left - len(span.text):
-                    continue
-
-                if span.pos.x < proxy_padding.left:
-                    yield Span(
-                        Vec(0, span.pos.y),
-                        span.text[proxy_padding.left - span.pos.x :],
-                        span.style,
-                    )
-
-                else:
-                    yield Span(
-                        span.pos,
-                        span.text[
-                            : render_table[self].dim.w
-                            - proxy_padding.right
-                            - span.pos.x
-                        ],
-                        span.style,
-                    )
+            yield from clip_spans(self._border(w, h), origin, clip)
+
+        inset: int = int(self.border)
+        padding: Padding = self.layout.padding
+        inner: Rect = clip & Rect(
+            origin + Vec(padding.left + inset, padding.top + inset),
+            Vec(
+                w - padding.left - padding.right - 2 * inset,
+                h - padding.top - padding.bottom - 2 * inset,
+            ),
+        )
+        if not inner:
+            return
+
+        (x0, y0), (inner_w, inner_h) = inner
+        x1, y1 = x0 + inner_w, y0 + inner_h
+        # children are laid out one after another, so the visible ones are a
+        # contiguous run starting at the first that ends past the clip's edge
+        horizontal: bool = self.layout.direction == Direction.Horizontal
+        first: int = bisect_right(
+            self.contents,
+            x0 - origin.x if horizontal else y0 - origin.y,
+            key=(
+                (lambda thing: xs[slot(thing)] + ws[slot(thing)])
+                if horizontal
+                else (lambda thing: ys[slot(thing)] + hs[slot(thing)])
+            ),
+        )
+        for thing in itertools.islice(self.contents, first, None):
+            i: int = slot(thing)
+            x: int = origin.x + xs[i]
+            y: int = origin.y + ys[i]
+            if (x >= x1) if horizontal else (y >= y1):
+                break
+
+            if x < x1 and y < y1 and x + ws[i] > x0 and y + hs[i] > y0:
+                yield from thing.draw(render_table, Vec(x, y), inner)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _border(w: int, h: int) -> list[Span]:
+        return list(Block._border_spans(w, h))
+
+    @staticmethod
+    def _border_spans(w: int, h: int) -> Iterator[Span]:
+        match w, h:
+            case (0, _) | (_, 0):
+                pass
+
+            case 1, 1:
+                yield Span(Vec(0, 0), "·")
+
+            case w, 1:
+                yield Span(Vec(0, 0), "─" * w)
+
+            case 1, h:
+                for dy in range(h):
+                    yield Span(Vec(0, dy), "│")
+
+            case w, h:
+                yield Span(Vec(0, 0), "".join(["┌", "─" * (w - 2), "┐"]))
+                for dy in range(1, h - 1):
+                    yield Span(Vec(0, dy), "│")
+                    yield Span(Vec(w - 1, dy), "│")
+                yield Span(Vec(0, h - 1), "".join(["└", "─" * (w - 2), "┘"]))
 
 
 class Term:
-    def __init__(self, *, layout: Layout | None = None, border=False):
+    OVERLAY_TIMES: list[str] = [
+        "dispatch",
+        "timer.lateness",
+        "term.size",
+        "term.place",
+        "term.render",
+        "term.diff",
+    ]
+    OVERLAY_COUNTS: list[str] = [
+        "term.spans",
+        "term.cells",
+        "term.rerendered",
+        "term.bytes",
+    ]
+
+    def __init__(
+        self,
+        *,
+        layout: Layout | None = None,
+        border=False,
+        stats: Stats | None = None,
+        overlay: bool = False,
+        backend: Backend | None = None,
+    ):
         self.block: Block = Block(layout=layout, border=border)
+        # None for whatever term.BACKEND is at render time
+        self.backend: Backend | None = backend
         self._current: Renderable = self.block
+        self.stats: Stats = loop.L.state.stats if stats is None else stats
+        # draw stats over the top right corner, forces a redraw every frame
+        self.overlay: bool = overlay
+
+        self.render_table: RenderTable = RenderTable()
+        # what the terminal currently shows, as of the last render
+        self._front: Surface | None = None
+        # reused to assemble each frame before its single write
+        self._comps: list[str] = []
 
     # inspired by airium
     def __call__(self, thing: Renderable) -> ContextManager[None]:
@@ -218,20 +475,97 @@ class Term:
     def add(self, thing: Renderable):
         self.block.add(thing)
 
+    def invalidate(self):
+        self._front = None
+
+    def _compose(self, w: int, h: int) -> Surface:
+        back: Surface = Surface(w, h)
+        sizing: Sizing = Sizing(Fixed(w), Fixed(h))
+        if self.block.layout.sizing != sizing:
+            self.block.layout.sizing = sizing
+            self.block.mark_dirty()
+
+        t_start: float = perf_counter()
+        self.block.size(self.render_table)
+        t_sized: float = perf_counter()
+        self.block.place(self.render_table)
+        t_placed: float = perf_counter()
+        misses: int = RENDER_CACHE.misses
+        n_spans: int = 0
+        n_cells: int = 0
+        for x, y, text, style in self.block.draw(
+            self.render_table, Vec(0, 0), Rect(Vec(0, 0), Vec(w, h))
+        ):
+            back.put(x, y, text, style.id)
+            n_spans += 1
+            n_cells += len(text)
+        t_rendered: float = perf_counter()
+
+        self.stats.add("term.size", t_sized - t_start)
+        self.stats.add("term.place", t_placed - t_sized)
+        self.stats.add("term.render", t_rendered - t_placed)
+        self.stats.add("term.spans", n_spans)
+        self.stats.add("term.cells", n_cells)
+        self.stats.add("term.rerendered", RENDER_CACHE.misses - misses)
+        return back
+
+    def _draw_overlay(self, back: Surface):
+        lines: list[str] = [
+            *(
+                f"{name:<15}{self.stats[name].percentile(50) * 1e3:7.2f}"
+                f"{self.stats[name].percentile(99) * 1e3:7.2f}ms"
+                for name in Term.OVERLAY_TIMES
+            ),
+            *(
+                f"{name:<15}{self.stats[name].percentile(50):7.0f}"
+                f"{self.stats[name].percentile(99):7.0f}  "
+                for name in Term.OVERLAY_COUNTS
+            ),
+        ]
+        style: int = STYLES.id(attrs=Attr.REVERSE)
+        for y, line in enumerate([f"{'p50':>22}{'p99':>7}  ", *lines]):
+            back.put(back.w - len(line), y, line, style)
+
     def render(self):
-        w("\x1b[2J")
-        render_table = RenderTable()
-        D = os.get_terminal_size()
-        self.block.layout.sizing = Sizing(Fixed(D.columns), Fixed(D.lines))
-        self.block.size(render_table)
-        self.block.place(render_table)
-        for span in self.block.render(render_table):
-            for dx, ch in enumerate(span.text):
-                w(cursor_to(span.pos + Vec(dx, 0)))
-                w(
-                    f"{span.style.fg_color.ansi_fg}{span.style.bg_color.ansi_bg}{ch}\x1b[0m"
-                )
-        f()
+        backend: Backend = self.backend or term.BACKEND
+        columns, lines = backend.size()
+        # polled refs are sampled once, then read the same all through layout
+        with Ref.frame():
+            Ref.poll()
+            if (
+                not self.overlay
+                and not self.block.dirty
+                and self._front is not None
+                and self._front.dim == Vec(columns, lines)
+            ):
+                return
+
+            back: Surface = self._compose(columns, lines)
+        if self.overlay:
+            self._draw_overlay(back)
+
+        t_start: float = perf_counter()
+        comps: list[str] = self._comps
+        comps.clear()
+        if backend.sync:
+            comps.append(SYNC_BEGIN)
+        n: int = len(comps)
+        if self._front is None or self._front.dim != back.dim:
+            # a freshly cleared screen is all blank cells
+            comps.append(CLEAR)
+            self._front = Surface(back.w, back.h)
+        back.diff_into(comps, self._front, depth=backend.depth)
+        self._front = back
+        if len(comps) == n:
+            return
+
+        if backend.sync:
+            comps.append(SYNC_END)
+        self.stats.add("term.diff", perf_counter() - t_start)
+        n_bytes: int = backend.n_bytes
+        backend.write("".join(comps))
+        backend.flush()
+        self.stats.add("term.bytes", backend.n_bytes - n_bytes)
 
 
 def tag_to_color(tag):
@@ -259,87 +593,177 @@ def is_valid_tag(tag):
     return tag_to_color(tag) is not Color.NONE
 
 
-def resolve_markup(markup: str) -> Iterator[Span]:
-    extract_text = re.compile(r"(?P<text>([^\[]|\[\[)*)(?P<rest>.*)")
-    extract_tag = re.compile(r"\[(?P<tag>[^\]]*)\](?P<rest>.*)")
-
-    pos = 0
-    tag_stack = []
-    s = markup
-    while s:
-        m = extract_text.match(s)
-        assert m is not None, f"invalid markup: '{markup}'"
-        text = m.group("text")
-        if text:
-            if tag_stack:
-                yield Span(
-                    Vec(pos, 0),
-                    text,
-                    Style(fg_color=tag_to_color(tag_stack[-1])),
-                )
+@lru_cache(maxsize=None)
+def tag_to_style(tag: str) -> Style:
+    return Style.of(fg_color=tag_to_color(tag))
+
+
+MARKUP_TOKEN = re.compile(
+    r"(?P<text>(?:[^\[]+|\[\[)+)|\[(?P<tag>[^\]]*)\]|(?P<invalid>\[)"
+)
+
+
+@dataclass(frozen=True)
+class Markup:
+    runs: tuple[tuple[str, Style], ...]
+    len: int
+
+
+@lru_cache(maxsize=4096)
+def parse_markup(markup: str) -> Markup:
+    runs: list[tuple[str, Style]] = []
+    l: int = 0
+    tag_stack: list[str] = []
+    styles: list[Style] = [Style.of()]
+    for m in MARKUP_TOKEN.finditer(markup):
+        text: str | None = m.group("text")
+        if text is not None:
+            text = text.replace("[[", "[")
+            runs.append((text, styles[-1]))
+            l += width(text)
+            continue
+
+        assert m.group("invalid") is None, f"invalid markup: '{markup}'"
+        tag: str = m.group("tag")
+        if tag:
+            if tag.startswith("/"):
+                assert tag_stack and tag[1:] in ["", tag_stack[-1]]
+                tag_stack.pop(-1)
+                styles.pop(-1)
             else:
-                yield Span(Vec(pos, 0), text)
-            pos += len(text)
-        s = m.group("rest")
-        if s:
-            m = extract_tag.match(s)
-            assert m is not None, f"invalid markup: '{markup}'"
-            tag = m.group("tag")
-            if tag:
-                if tag.startswith("/"):
-                    assert tag[1:] in ["", tag_stack[-1]]
-                    tag_stack.pop(-1)
-                else:
-                    assert is_valid_tag(tag), f"invalid tag: {tag}"
-                    tag_stack.append(tag)
-            s = m.group("rest")
+                assert is_valid_tag(tag), f"invalid tag: {tag}"
+                tag_stack.append(tag)
+                styles.append(tag_to_style(tag))
     assert not tag_stack, f"unclosed tags: {', '.join(tag_stack)} in '{markup}'"
+    return Markup(tuple(runs), l)
+
+
+def resolve_markup(markup: str) -> Iterator[Span]:
+    pos: int = 0
+    for text, style in parse_markup(markup).runs:
+        yield Span(Vec(pos, 0), text, style)
+        pos += width(text)
 
 
 def len_markup(markup: str) -> int:
-    extract_text = re.compile(r"(?P<text>([^\[]|\[\[)*)(?P<rest>.*)")
-    extract_tag = re.compile(r"\[(?P<tag>[^\]]*)\](?P<rest>.*)")
-
-    l = 0
-    tag_stack = []
-    s = markup
-    while s:
-        m = extract_text.match(s)
-        assert m is not None, f"invalid markup: '{markup}'"
-        text = m.group("text")
-        if text:
-            l += len(text)
-        s = m.group("rest")
-        if s:
-            m = extract_tag.match(s)
-            assert m is not None, f"invalid markup: '{markup}'"
-            tag = m.group("tag")
-            if tag:
-                if tag.startswith("/"):
-                    assert tag[1:] in ["", tag_stack[-1]]
-                    tag_stack.pop(-1)
-                else:
-                    assert is_valid_tag(tag), f"invalid tag: {tag}"
-                    tag_stack.append(tag)
-            s = m.group("rest")
-    assert not tag_stack, f"unclosed tags: {', '.join(tag_stack)} in '{markup}'"
-    return l
+    return parse_markup(markup).len
 
 
 class Text(Renderable):
     def __init__(self, text: str | Ref[str]):
         super().__init__()
         self.text: Ref[str] = Ref.of(text)
+        self.text.subscribe(self.mark_dirty)
 
     @override
     def size(self, render_table: RenderTable):
-        render_table[self].dim = Dim(len_markup(self.text.value), 1)
+        render_table.set_dim(self, len_markup(self.text.value), 1)
 
     @override
     def place(self, render_table: RenderTable):
-        pass
+        self.dirty = False
 
     @override
     def render(self, render_table: RenderTable) -> Iterator[Span]:
         # yield Span(Vec(0, 0), self.text.value)
         yield from resolve_markup(self.text.value)
+
+
+T = TypeVar("T")
+
+
+# a window of height rows onto items, where only the rows in view are turned
+# into markup, sized and rendered, so off-screen items cost nothing beyond
+# whatever the item source itself holds
+class ScrollList(Renderable, Generic[T]):
+    def __init__(
+        self,
+        items: Sequence[T] | Ref[Sequence[T]],
+        row: Callable[[int, T], str],
+        *,
+        height: int | Ref[int],
+        width: int | None = None,
+    ):
+        super().__init__()
+        self.items: Ref[Sequence[T]] = Ref.of(items)
+        self.items.subscribe(self.mark_dirty)
+        # rows in view, a ref to follow e.g. the terminal's size
+        self.view_height: Ref[int] = Ref.of(height)
+        self.view_height.subscribe(self.mark_dirty)
+        # markup for the item at an index
+        self.row: Callable[[int, T], str] = row
+        # None to fit the widest row in view
+        self.width: int | None = width
+        # one cell per item in y
+        self.view: View = View(
+            Rect(Vec(0, 0), Vec(0, max(0, self.view_height.value)))
+        )
+        self._rows: list[str] = []
+
+    @property
+    def top(self) -> int:
+        return self.view.rect.pos.y
+
+    @property
+    def height(self) -> int:
+        return self.view.rect.dim.y
+
+    def scroll(self, n: int):
+        self.scroll_to(self.top + n)
+
+    def scroll_to(self, top: int):
+        last: int = self.top
+        self.view.rect @= Vec(0, top)
+        self.view.clamp(
+            Rect(Vec(0, 0), Vec(self.view.rect.dim.x, len(self.items.value))),
+            underflow_ok=True,
+        )
+        if self.top != last:
+            self.mark_dirty()
+
+    # scroll as little as possible to bring an item into view
+    def show(self, idx: int):
+        if idx < self.top:
+            self.scroll_to(idx)
+        elif idx >= self.top + self.height:
+            self.scroll_to(idx - self.height + 1)
+
+    @override
+    def size(self, render_table: RenderTable):
+        items: Sequence[T] = self.items.value
+        h: int = max(0, self.view_height.value)
+        self.view.rect = Rect(self.view.rect.pos, Vec(self.view.rect.dim.x, h))
+        # the items may have shrunk, or the view grown, since the last scroll
+        self.scroll_to(self.top)
+        self._rows = [
+            self.row(idx, items[idx])
+            for idx in range(self.top, min(self.top + self.height, len(items)))
+        ]
+        w: int = (
+            max(map(len_markup, self._rows), default=0)
+            if self.width is None
+            else self.width
+        )
+        self.view.rect = Rect(self.view.rect.pos, Vec(w, self.height))
+        render_table.set_dim(self, w, self.height)
+
+    @override
+    def place(self, render_table: RenderTable):
+        self.dirty = False
+
+    @override
+    def render(self, render_table: RenderTable) -> Iterator[Span]:
+        for y, markup in enumerate(self._rows):
+            for span in resolve_markup(markup):
+                yield Span(Vec(span.pos.x, y), span.text, span.style)
+
+    # rows wider than a fixed width are cut rather than drawn over siblings
+    @override
+    def draw(
+        self, render_table: RenderTable, origin: Vec, clip: Rect
+    ) -> Iterator[Run]:
+        return clip_spans(
+            RENDER_CACHE.spans(self, render_table),
+            origin,
+            clip & Rect(origin, Vec(*render_table.dim(self))),
+        )
@@ -0,0 +1,62 @@
+from events import Key, Mod, Mouse, MouseAction, Parser, Paste, coalesce
+
+
+def test_csi_split_across_reads():
+    parser: Parser = Parser()
+    assert parser.feed("a\x1b[1;") == [Key("a")]
+    assert parser.waiting
+    assert parser.feed("5A") == [Key("up", Mod.CTRL)]
+    assert not parser.waiting
+
+
+def test_sgr_mouse_split_across_reads():
+    parser: Parser = Parser()
+    assert parser.feed("\x1b[<0;12") == []
+    assert parser.feed(";3M\x1b[<0;12;3m") == [
+        Mouse(11, 2, MouseAction.Press, 0),
+        Mouse(11, 2, MouseAction.Release, 0),
+    ]
+    assert parser.feed("\x1b[<65;1;1M") == [Mouse(0, 0, MouseAction.Scroll, 1)]
+
+
+def test_paste_across_reads():
+    parser: Parser = Parser()
+    assert parser.feed("x\x1b[200~hello \x1b[A") == [Key("x")]
+    # the end marker itself split in two
+    assert parser.feed("world\x1b[20") == []
+    assert parser.feed("1~y") == [Paste("hello \x1b[Aworld"), Key("y")]
+
+
+def test_lone_escape_is_flushed_as_the_key():
+    parser: Parser = Parser()
+    assert parser.feed("\x1b") == []
+    assert parser.flush() == [Key("escape")]
+    assert parser.feed("\x1b[") == []
+    assert parser.flush() == [Key("escape"), Key("[")]
+    assert parser.flush() == []
+
+
+def test_keys():
+    parser: Parser = Parser()
+    assert parser.feed("\r\x7f\x01\x1bx\x1b[3~\x1b[Z\x1bOP") == [
+        Key("enter"),
+        Key("backspace"),
+        Key("a", Mod.CTRL),
+        Key("x", Mod.ALT),
+        Key("delete"),
+        Key("tab", Mod.SHIFT),
+        Key("f1"),
+    ]
+
+
+def test_motion_is_coalesced():
+    moves: list[Mouse] = [Mouse(x, 0, MouseAction.Move, 3) for x in range(3)]
+    press: Mouse = Mouse(2, 0, MouseAction.Press, 0)
+    drag: Mouse = Mouse(4, 0, MouseAction.Move, 0)
+    assert coalesce([*moves, press, drag, Mouse(5, 0, MouseAction.Move, 0)]) == [
+        moves[-1],
+        press,
+        Mouse(5, 0, MouseAction.Move, 0),
+    ]
+    # different buttons are kept apart
+    assert coalesce([moves[0], drag]) == [moves[0], drag]
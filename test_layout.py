@@ -0,0 +1,60 @@
+from layout import Direction, Layout
+from ref import Ref
+from term import MemoryBackend
+from term2 import Block, RenderTable, Term, Text
+from vt import VirtualTerminal
+
+
+def positions(t: Term, block: Block) -> list[tuple[int, int, int, int]]:
+    table: RenderTable = t.render_table
+    return [(*table.pos(thing), *table.dim(thing)) for thing in block]
+
+
+def test_relayout_follows_changed_child():
+    rows: list[Ref[str]] = [Ref("x" * i) for i in range(5)]
+    block: Block = Block(
+        *map(Text, rows), layout=Layout(direction=Direction.Horizontal)
+    )
+    t: Term = Term(backend=MemoryBackend(40, 4, keep=False))
+    t(block)
+    t.render()
+
+    # same width, nothing moves
+    rows[1].set_value("y")
+    t.render()
+    assert positions(t, block) == [
+        (0, 0, 0, 1),
+        (0, 0, 1, 1),
+        (1, 0, 2, 1),
+        (3, 0, 3, 1),
+        (6, 0, 4, 1),
+    ]
+
+    # wider, everything after it moves
+    rows[2].set_value("zzzzz")
+    t.render()
+    assert positions(t, block) == [
+        (0, 0, 0, 1),
+        (0, 0, 1, 1),
+        (1, 0, 5, 1),
+        (6, 0, 3, 1),
+        (9, 0, 4, 1),
+    ]
+    assert tuple(t.render_table.dim(block)) == (13, 1)
+
+
+def test_resize_relays_out_the_root():
+    vt: VirtualTerminal = VirtualTerminal(20, 4)
+    t: Term = Term(border=True, backend=vt)
+    t(Text("hello"))
+    t.render()
+
+    vt.resize(30, 6)
+    t.render()
+    assert tuple(t.render_table.dim(t.block)) == (30, 6)
+    assert vt.lines() == [
+        "┌" + "─" * 28 + "┐",
+        "│hello" + " " * 23 + "│",
+        *(["│" + " " * 28 + "│"] * 3),
+        "└" + "─" * 28 + "┘",
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+from time import monotonic, sleep
+
+import pytest
+
+from loop import Loop, Timer
+
+
+def test_self_cancelling_interval_is_not_counted():
+    loop: Loop = Loop(max_fps=None)
+    timers: list[Timer] = []
+    runs: list[int] = []
+
+    def make(i: int):
+        def tick():
+            runs.append(i)
+            timers[i].cancel()
+
+        return tick
+
+    # few enough that compaction never resets the count
+    for i in range(10):
+        timers.append(loop.interval(make(i), seconds=0.001))
+    loop.after(loop.stop, seconds=0.02)
+    loop.start()
+
+    assert sorted(runs) == list(range(10))
+    assert loop._n_cancelled == 0
+    assert loop.timers == []
+
+
+def test_cancelled_timers_are_counted_until_dropped():
+    loop: Loop = Loop(max_fps=None)
+    timer: Timer = loop.interval(lambda: None, seconds=1)
+    timer.cancel()
+    timer.cancel()
+    assert loop._n_cancelled == 1
+
+    loop._run_timers(timer.when)
+    assert loop._n_cancelled == 0
+    assert loop.timers == []
+
+
+def test_run_skips_missed_frames_after_a_stall():
+    loop: Loop = Loop(max_fps=100)
+    frames: list[float] = []
+
+    stalled: list[float] = []
+
+    def frame():
+        frames.append(monotonic())
+        if len(frames) == 2:
+            sleep(0.1)
+            stalled.append(monotonic())
+
+    loop.register(frame)
+    loop.after(loop.stop, seconds=0.15)
+    asyncio.run(loop.run())
+
+    # ten frames were missed during the stall; run back to back, they would
+    # all land right after it
+    burst: list[float] = [t for t in frames if 0 <= t - stalled[0] < 0.008]
+    assert len(burst) <= 2
+
+
+def test_coroutine_funcs_are_rejected():
+    loop: Loop = Loop()
+
+    async def frame():
+        pass
+
+    with pytest.raises(TypeError):
+        loop.register(frame)
+
+    loop.register(lambda: frame())
+    with pytest.raises(TypeError):
+        loop.dispatch()
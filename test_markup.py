@@ -0,0 +1,38 @@
+import pytest
+
+from color import Color
+from term2 import Style, len_markup, parse_markup
+
+PLAIN: Style = Style.of()
+RED: Style = Style.of(fg_color=Color.RED)
+BLUE: Style = Style.of(fg_color=Color.BLUE)
+
+
+def test_escaped_brackets():
+    # [[ is one [ and one column; a lone ] needs no escape
+    assert parse_markup("a[[b]").runs == (("a[b]", PLAIN),)
+    assert parse_markup("[[red]]").runs == (("[red]]", PLAIN),)
+    assert len_markup("[[red]x[[") == 7
+    assert parse_markup("[red][[x][/red]").runs == (("[x]", RED),)
+
+
+def test_close_any_and_nesting():
+    assert parse_markup("[red]x[/]y").runs == (("x", RED), ("y", PLAIN))
+    assert parse_markup("[red]a[blue]b[/blue]c[/red]").runs == (
+        ("a", RED),
+        ("b", BLUE),
+        ("c", RED),
+    )
+    assert parse_markup("[red]a[blue]b[/][/]c") == parse_markup(
+        "[red]a[blue]b[/blue][/red]c"
+    )
+    assert len_markup("[red]a[blue]世[/blue][/red]") == 3
+
+
+@pytest.mark.parametrize(
+    "markup",
+    ["a[b", "[red]x", "[bogus]x[/bogus]", "[red]x[/blue]", "[/red]", "x[/]"],
+)
+def test_invalid_markup(markup: str):
+    with pytest.raises(AssertionError):
+        parse_markup(markup)
@@ -0,0 +1,128 @@
+from concurrent.futures import wait
+from threading import Event
+from time import sleep
+
+import pytest
+
+from ref import AsyncRef, Ref
+from term import MemoryBackend
+from term2 import Term, Text
+
+
+def settle(ref: AsyncRef):
+    if ref._future is not None:
+        wait([ref._future])
+    Ref.poll()
+
+
+def test_async_ref_raises_until_first_success():
+    calls: list[int] = []
+
+    def get() -> int:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("flaky")
+        return len(calls)
+
+    ref: AsyncRef[int] = AsyncRef(get, every=0.1)
+    with pytest.raises(RuntimeError):
+        ref.value
+    # not retried before every has passed, but the same error again
+    with pytest.raises(RuntimeError):
+        ref.value
+    assert len(calls) == 1
+
+    sleep(0.15)
+    Ref.poll()
+    assert ref.value == 2
+    assert ref.error is None
+
+
+def test_async_ref_keeps_last_value_on_error():
+    results: list[int | None] = [1, None]
+
+    def get() -> int:
+        result: int | None = results.pop(0) if results else 3
+        if result is None:
+            raise RuntimeError("flaky")
+        return result
+
+    ref: AsyncRef[int] = AsyncRef(get, every=0.01)
+    assert ref.value == 1
+
+    sleep(0.02)
+    Ref.poll()
+    settle(ref)
+    assert ref.value == 1
+    assert isinstance(ref.error, RuntimeError)
+
+    sleep(0.02)
+    Ref.poll()
+    settle(ref)
+    assert ref.value == 3
+    assert ref.error is None
+
+
+def test_async_ref_getter_may_return_none():
+    ref: AsyncRef[None] = AsyncRef(lambda: None, every=0.01)
+    assert ref.value is None
+    assert ref.value is None
+
+
+def test_async_ref_one_refresh_in_flight():
+    calls: list[int] = []
+    done: Event = Event()
+
+    def get() -> int:
+        calls.append(0)
+        done.wait()
+        return len(calls)
+
+    ref: AsyncRef[int] = AsyncRef(get, 0, every=0.001)
+    for _ in range(20):
+        Ref.poll()
+        sleep(0.002)
+    done.set()
+    assert ref.value == 0
+    assert len(calls) == 1
+
+
+def test_getter_ref_samples_once_per_frame():
+    calls: list[int] = []
+
+    def get() -> int:
+        calls.append(0)
+        return len(calls)
+
+    ref: Ref[int] = Ref(getter=get)
+    # with no frame in progress, every read samples
+    assert [ref.value, ref.value, ref.value] == [1, 2, 3]
+
+    with Ref.frame():
+        assert [ref.value, ref.value] == [4, 4]
+        Ref.poll()
+        assert ref.value == 4
+    assert ref.value == 5
+
+
+def test_poll_neither_waits_on_nor_raises_from_async_refs():
+    release: Event = Event()
+
+    # a poll that waited on it would see it time out
+    def slow() -> str:
+        return "done" if release.wait(1) else "timed out"
+
+    def down() -> str:
+        raise OSError("collector down")
+
+    # neither is displayed, and neither has ever had a value
+    refs: list[AsyncRef[str]] = [AsyncRef(slow), AsyncRef(down)]
+    t: Term = Term(backend=MemoryBackend(10, 2, keep=False))
+    t(Text("ok"))
+    t.render()
+    Ref.poll()
+
+    release.set()
+    assert refs[0].value == "done"
+    with pytest.raises(OSError):
+        refs[1].value
@@ -0,0 +1,69 @@
+import io
+import os
+import shutil
+import signal
+
+import pytest
+
+from term import TtyBackend, Vec
+from term2 import Term, Text
+from vt import VirtualTerminal
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(signal, "SIGWINCH"), reason="needs SIGWINCH"
+)
+
+
+@pytest.fixture
+def tty(monkeypatch: pytest.MonkeyPatch):
+    size: list[os.terminal_size] = [os.terminal_size((20, 4))]
+    queries: list[int] = []
+
+    def get_terminal_size(*args: object) -> os.terminal_size:
+        queries.append(0)
+        return size[0]
+
+    monkeypatch.setattr(shutil, "get_terminal_size", get_terminal_size)
+    monkeypatch.setattr("sys.stdout", io.StringIO())
+    previous = signal.getsignal(signal.SIGWINCH)
+    yield TtyBackend(sync=False), size, queries
+    signal.signal(signal.SIGWINCH, previous)
+
+
+def test_size_is_queried_once_per_resize(tty):
+    backend, size, queries = tty
+    assert backend.size() == Vec(20, 4)
+    size[0] = os.terminal_size((30, 6))
+    assert backend.size() == Vec(20, 4)
+    assert len(queries) == 1
+
+    # a storm of signals costs a single query
+    for _ in range(3):
+        os.kill(os.getpid(), signal.SIGWINCH)
+    assert backend.resizes == 3
+    assert backend.size() == Vec(30, 6)
+    assert backend.size() == Vec(30, 6)
+    assert len(queries) == 2
+
+
+def test_term_redraws_after_a_resize(tty, monkeypatch: pytest.MonkeyPatch):
+    backend, size, _ = tty
+    t: Term = Term(border=True, backend=backend)
+    t(Text("hello"))
+    t.render()
+
+    size[0] = os.terminal_size((30, 6))
+    os.kill(os.getpid(), signal.SIGWINCH)
+    stdout: io.StringIO = io.StringIO()
+    monkeypatch.setattr("sys.stdout", stdout)
+    t.render()
+
+    # the frame after a resize clears the screen and stands on its own
+    vt: VirtualTerminal = VirtualTerminal(30, 6)
+    vt.write(stdout.getvalue())
+    assert vt.lines() == [
+        "┌" + "─" * 28 + "┐",
+        "│hello" + " " * 23 + "│",
+        *(["│" + " " * 28 + "│"] * 3),
+        "└" + "─" * 28 + "┘",
+    ]
@@ -0,0 +1,61 @@
+from ref import Ref
+from term2 import ScrollList, Term
+from vt import VirtualTerminal
+
+
+def scroll_list(n: int, height: int | Ref[int]) -> tuple[ScrollList[int], list[int]]:
+    made: list[int] = []
+
+    def row(idx: int, item: int) -> str:
+        made.append(idx)
+        return f"row {item}"
+
+    return ScrollList(list(range(n)), row, height=height), made
+
+
+def test_scroll_to_and_show_clamp():
+    rows, _ = scroll_list(100, 5)
+    rows.scroll_to(200)
+    assert rows.top == 95
+    rows.scroll(-200)
+    assert rows.top == 0
+
+    rows.show(50)
+    assert rows.top == 46
+    rows.show(48)
+    assert rows.top == 46
+    rows.show(10)
+    assert rows.top == 10
+
+    # fewer items than rows stays at the top
+    short, _ = scroll_list(3, 5)
+    short.scroll_to(2)
+    assert short.top == 0
+
+
+def test_only_visible_rows_are_made_and_drawn():
+    vt: VirtualTerminal = VirtualTerminal(10, 4)
+    t: Term = Term(backend=vt)
+    rows, made = scroll_list(10_000, 3)
+    t(rows)
+    rows.scroll_to(5000)
+    t.render()
+    assert sorted(made) == [5000, 5001, 5002]
+    assert vt.lines() == ["row 5000  ", "row 5001  ", "row 5002  ", " " * 10]
+
+
+def test_height_follows_a_ref():
+    vt: VirtualTerminal = VirtualTerminal(10, 4)
+    t: Term = Term(backend=vt)
+    height: Ref[int] = Ref(2)
+    rows, _ = scroll_list(10, height)
+    t(rows)
+    rows.scroll_to(9)
+    t.render()
+    assert rows.top == 8
+    assert vt.lines()[:3] == ["row 8     ", "row 9     ", " " * 10]
+
+    height.set_value(4)
+    t.render()
+    assert rows.top == 6
+    assert vt.lines() == ["row 6     ", "row 7     ", "row 8     ", "row 9     "]
@@ -0,0 +1,41 @@
+from array import array
+
+from term import Surface
+
+
+def test_put_spreads_styles_over_wide_glyphs():
+    surface: Surface = Surface(8, 1)
+    surface.put(0, 0, "a世b界c", array("I", [1, 2, 3, 4, 5]))
+    assert surface.glyphs[:7] == ["a", "世", "", "b", "界", "", "c"]
+    assert list(surface.styles[:7]) == [1, 2, 2, 3, 4, 4, 5]
+
+
+def test_put_keeps_zero_width_with_their_glyph():
+    surface: Surface = Surface(8, 1)
+    surface.put(0, 0, "e\u0301世x", array("I", [1, 2, 3, 4]))
+    assert surface.glyphs[:4] == ["e\u0301", "世", "", "x"]
+    assert list(surface.styles[:4]) == [1, 3, 3, 4]
+
+
+def test_put_clips_mixed_width_styles():
+    surface: Surface = Surface(4, 1)
+    surface.put(-1, 0, "世ab界", array("I", [1, 2, 3, 4]))
+    assert surface.glyphs == [" ", "a", "b", " "]
+    assert list(surface.styles) == [1, 2, 3, 4]
+
+
+def test_put_drops_text_past_the_right_edge():
+    surface: Surface = Surface(10, 3)
+    surface.put(15, 0, "a" * 26)
+    surface.put(12, 2, "b" * 26)
+    assert len(surface.glyphs) == 30
+    assert surface.glyphs == [" "] * 30
+
+
+def test_put_one_cell_splits_wide_glyphs():
+    surface: Surface = Surface(4, 1)
+    surface.put(0, 0, "世界")
+    surface.put(1, 0, "a", 7)
+    surface.put(2, 0, "b")
+    assert surface.glyphs == [" ", "a", "b", " "]
+    assert list(surface.styles) == [0, 7, 0, 0]
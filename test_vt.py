@@ -0,0 +1,71 @@
+from color import Color
+from layout import Direction, Layout
+from ref import Ref
+from term import Attr, Vec
+from term2 import Term, Text
+from vt import VirtualTerminal
+
+
+def test_wide_glyph_wider_than_the_line():
+    vt: VirtualTerminal = VirtualTerminal(1, 2)
+    vt.write("世a")
+    assert vt.lines() == [" ", "a"]
+
+
+def test_sgr_sets_cell_styles():
+    vt: VirtualTerminal = VirtualTerminal(6, 1)
+    vt.write("\x1b[1;31mab\x1b[0m\x1b[48;5;21mc\x1b[38;2;1;2;3md\x1b[39;49me")
+    assert vt.lines() == ["abcde "]
+    assert vt[Vec(1, 0)] == ("b", Color.RED, Color.NONE, Attr.BOLD)
+    assert vt[Vec(2, 0)] == ("c", Color.NONE, Color(0, 0, 255), Attr.NONE)
+    assert vt[Vec(3, 0)] == ("d", Color(1, 2, 3), Color(0, 0, 255), Attr.NONE)
+    assert vt[Vec(4, 0)] == ("e", Color.NONE, Color.NONE, Attr.NONE)
+
+
+def test_wrap_and_scroll():
+    vt: VirtualTerminal = VirtualTerminal(4, 2)
+    vt.write("abcdefghij")
+    assert vt.lines() == ["efgh", "ij  "]
+    assert vt.cursor == Vec(2, 1)
+
+
+def test_wide_glyph_wraps_whole():
+    vt: VirtualTerminal = VirtualTerminal(4, 2)
+    vt.write("abc世x")
+    assert vt.lines() == ["abc ", "世x "]
+
+
+def test_cursor_moves_and_erase():
+    vt: VirtualTerminal = VirtualTerminal(4, 3)
+    vt.write("aaaa\r\nbbbb\r\ncccc\x1b[2;2H\x1b[J")
+    assert vt.lines() == ["aaaa", "b   ", "    "]
+    vt.write("\x1b[1;3H\x1b[K\x1b[3;1Hz\x1b[Cy")
+    assert vt.lines() == ["aa  ", "b   ", "z y "]
+    vt.write("\x1b[2J")
+    assert vt.lines() == ["    "] * 3
+
+
+def test_frames_round_trip():
+    vt: VirtualTerminal = VirtualTerminal(12, 2)
+    t: Term = Term(layout=Layout(direction=Direction.Vertical), backend=vt)
+    first: Ref[str] = Ref("[red]ab[/red]c")
+    t(Text(first))
+    t(Text("[[x] 世"))
+    t.render()
+    # the right half of the wide glyph adds nothing to its line
+    assert vt.lines() == ["abc         ", "[x] 世      "]
+    assert vt[Vec(1, 0)][1] == Color.RED
+    assert vt[Vec(2, 0)][1] == Color.NONE
+
+    # only the change is written, and the screen matches what a full redraw
+    # would show
+    n_bytes: int = vt.n_bytes
+    first.set_value("a[green]bc[/green]")
+    t.render()
+    assert vt.n_bytes - n_bytes < 40
+    assert vt.lines()[0] == "abc         "
+    assert [vt[Vec(x, 0)][1] for x in range(3)] == [
+        Color.NONE,
+        Color.GREEN,
+        Color.GREEN,
+    ]
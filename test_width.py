@@ -0,0 +1,16 @@
+from width import cells, char_width, columns, narrow, width
+
+
+def test_control_characters_agree_across_paths():
+    for s in ["\x01", "a\x1bb", "\t"]:
+        assert not narrow(s)
+        assert width(s) == sum(map(char_width, s)) == len(cells(s))
+
+
+def test_emoji_modifiers_and_zwj_sequences_join_one_glyph():
+    assert width("👍🏽") == 2
+    assert cells("👍🏽x") == ["👍🏽", "", "x"]
+    # woman, zwj, laptop
+    assert width("👩‍💻") == 2
+    assert cells("[👩‍💻]") == ["[", "👩‍💻", "", "]"]
+    assert columns("👩‍💻 build", 0, 4) == "👩‍💻 b"
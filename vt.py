@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import re
+from typing_extensions import override
+
+from color import Color, Depth, xterm_rgb
+from term import ATTR_SGR, STYLES, Attr, MemoryBackend, Surface, Vec
+from width import cells
+
+# csi sequence, run of printable text, or a lone control character
+TOKEN = re.compile(
+    r"\x1b\[([0-?]*)[ -/]*([@-~])|([^\x00-\x1f\x7f]+)|(.)",
+    re.DOTALL,
+)
+
+ATTR_ON: dict[int, Attr] = {int(on): attr for attr, (on, _) in ATTR_SGR.items()}
+ATTR_OFF: dict[int, Attr] = {}
+for attr, (_, off) in ATTR_SGR.items():
+    ATTR_OFF[int(off)] = ATTR_OFF.get(int(off), Attr.NONE) | attr
+
+
+def xterm_color(n: int) -> Color:
+    return Color.system(n) if n < 16 else Color(*xterm_rgb(n))
+
+
+class VirtualTerminal(MemoryBackend):
+    def __init__(self, w: int = 80, h: int = 24, *, depth: Depth = Depth.TRUECOLOR):
+        super().__init__(w, h, keep=False, depth=depth)
+        self.sync: bool = True
+        self.surface: Surface = Surface(w, h)
+        self.cursor: Vec = Vec(0, 0)
+        self.cursor_visible: bool = True
+        self.fg: Color = Color.NONE
+        self.bg: Color = Color.NONE
+        self.attrs: Attr = Attr.NONE
+        # private modes that were set, e.g. 2026 for synchronized output
+        self.modes: set[int] = set()
+
+    def resize(self, w: int, h: int):
+        self.dim = Vec(w, h)
+        self.surface = Surface(w, h)
+        self.cursor = Vec(min(self.cursor.x, w - 1), min(self.cursor.y, h - 1))
+
+    @override
+    def write(self, s: str):
+        super().write(s)
+        for m in TOKEN.finditer(s):
+            params, final, text, control = m.groups()
+            if text is not None:
+                self._print(text)
+
+            elif final is not None:
+                self._csi(params, final)
+
+            elif control == "\n":
+                self._line_feed()
+                self.cursor = Vec(0, self.cursor.y)
+
+            elif control == "\r":
+                self.cursor = Vec(0, self.cursor.y)
+
+            elif control == "\b":
+                self.cursor = Vec(max(0, self.cursor.x - 1), self.cursor.y)
+
+    def __getitem__(self, v: Vec) -> tuple[str, Color, Color, Attr]:
+        i: int = v.y * self.surface.w + v.x
+        fg, bg, attrs = STYLES.keys[self.surface.styles[i]]
+        return self.surface.glyphs[i] or " ", fg, bg, attrs
+
+    def line(self, y: int) -> str:
+        base: int = y * self.surface.w
+        # the right half of a wide glyph is "", and adds nothing
+        return "".join(
+            " " if ch is None else ch
+            for ch in self.surface.glyphs[base : base + self.surface.w]
+        )
+
+    def lines(self) -> list[str]:
+        return [self.line(y) for y in range(self.surface.h)]
+
+    def text(self) -> str:
+        return "\n".join(line.rstrip() for line in self.lines())
+
+    def _print(self, text: str):
+        style: int = STYLES.id(self.fg, self.bg, self.attrs)
+        glyphs: list[str] = cells(text)
+        while glyphs:
+            if self.cursor.x >= self.dim.x:
+                self._line_feed()
+                self.cursor = Vec(0, self.cursor.y)
+            n: int = self.dim.x - self.cursor.x
+            # a wide glyph that does not fit wraps to the next line whole
+            if n < len(glyphs) and glyphs[n] == "":
+                n -= 1
+            if n == 0:
+                # wider than a whole line, so it could never fit
+                if self.cursor.x == 0:
+                    glyphs = [" ", *glyphs[2:]]
+                else:
+                    self.cursor = Vec(self.dim.x, self.cursor.y)
+                continue
+
+            self.surface.put_cells(self.cursor.x, self.cursor.y, glyphs[:n], style)
+            self.cursor = Vec(self.cursor.x + len(glyphs[:n]), self.cursor.y)
+            glyphs = glyphs[n:]
+
+    def _line_feed(self):
+        if self.cursor.y + 1 < self.dim.y:
+            self.cursor = Vec(self.cursor.x, self.cursor.y + 1)
+        else:
+            self.surface.scroll()
+
+    def _csi(self, params: str, final: str):
+        if params.startswith("?"):
+            modes: list[int] = [int(p) for p in params[1:].split(";") if p]
+            if final == "h":
+                self.modes.update(modes)
+            elif final == "l":
+                self.modes.difference_update(modes)
+            if 25 in modes:
+                self.cursor_visible = final == "h"
+            return
+
+        args: list[int] = [int(p) if p else 0 for p in params.split(";")]
+        n: int = max(1, args[0])
+        x, y = self.cursor
+        w, h = self.dim
+        match final:
+            case "H" | "f":
+                row: int = args[0] if args else 1
+                col: int = args[1] if len(args) > 1 else 1
+                self.cursor = Vec(min(max(col, 1), w) - 1, min(max(row, 1), h) - 1)
+
+            case "A":
+                self.cursor = Vec(x, max(0, y - n))
+
+            case "B":
+                self.cursor = Vec(x, min(h - 1, y + n))
+
+            case "C":
+                self.cursor = Vec(min(w - 1, x + n), y)
+
+            case "D":
+                self.cursor = Vec(max(0, x - n), y)
+
+            case "G":
+                self.cursor = Vec(min(w, n) - 1, y)
+
+            case "J":
+                match args[0]:
+                    case 0:
+                        self.surface.erase(y * w + x, w * h)
+                    case 1:
+                        self.surface.erase(0, y * w + x + 1)
+                    case 2 | 3:
+                        self.surface.erase(0, w * h)
+
+            case "K":
+                match args[0]:
+                    case 0:
+                        self.surface.erase(y * w + x, (y + 1) * w)
+                    case 1:
+                        self.surface.erase(y * w, y * w + x + 1)
+                    case 2:
+                        self.surface.erase(y * w, (y + 1) * w)
+
+            case "m":
+                self._sgr(args)
+
+    def _sgr(self, args: list[int]):
+        i: int = 0
+        while i < len(args):
+            arg: int = args[i]
+            if arg == 0:
+                self.fg, self.bg, self.attrs = Color.NONE, Color.NONE, Attr.NONE
+            elif arg in ATTR_ON:
+                self.attrs |= ATTR_ON[arg]
+            elif arg in ATTR_OFF:
+                self.attrs &= ~ATTR_OFF[arg]
+            elif 30 <= arg <= 37:
+                self.fg = Color.system(arg - 30)
+            elif 90 <= arg <= 97:
+                self.fg = Color.system(arg - 90 + 8)
+            elif 40 <= arg <= 47:
+                self.bg = Color.system(arg - 40)
+            elif 100 <= arg <= 107:
+                self.bg = Color.system(arg - 100 + 8)
+            elif arg == 39:
+                self.fg = Color.NONE
+            elif arg == 49:
+                self.bg = Color.NONE
+            elif arg in (38, 48) and i + 1 < len(args):
+                color: Color | None = None
+                if args[i + 1] == 5 and i + 2 < len(args):
+                    color = xterm_color(args[i + 2])
+                    i += 2
+                elif args[i + 1] == 2 and i + 4 < len(args):
+                    color = Color(*args[i + 2 : i + 5])
+                    i += 4
+                if color is not None:
+                    if arg == 38:
+                        self.fg = color
+                    else:
+                        self.bg = color
+            i += 1
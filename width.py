@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import unicodedata
+
+# columns taken by each character seen so far, filled from unicodedata on first
+# sight so that importing costs nothing and each character is classified once
+WIDTHS: dict[str, int] = {chr(c): 1 for c in range(0x20, 0x7F)}
+
+# hangul jungseong and jongseong, which join the preceding syllable
+JOINING: range = range(0x1160, 0x1200)
+# skin tone modifiers, which join the emoji before them
+EMOJI_MODIFIERS: range = range(0x1F3FB, 0x1F400)
+# zero width joiner: the character after it is part of the same glyph
+ZWJ: str = "\u200d"
+
+
+def char_width(ch: str) -> int:
+    w: int | None = WIDTHS.get(ch)
+    if w is None:
+        w = WIDTHS[ch] = _classify(ch)
+    return w
+
+
+def _classify(ch: str) -> int:
+    c: int = ord(ch)
+    if c < 0x20 or 0x7F <= c < 0xA0:
+        return 0
+
+    if (
+        c == 0x200B
+        or c in JOINING
+        or c in EMOJI_MODIFIERS
+        or unicodedata.category(ch) in ("Mn", "Me", "Cf")
+    ):
+        return 0
+
+    if unicodedata.east_asian_width(ch) in ("W", "F"):
+        return 2
+
+    return 1
+
+
+# every character takes exactly one column, so code points are columns, as
+# for printable ascii or box drawing
+def narrow(s: str) -> bool:
+    return (s.isascii() and s.isprintable()) or _narrow(s)
+
+
+@lru_cache(maxsize=4096)
+def _narrow(s: str) -> bool:
+    return all(char_width(ch) == 1 for ch in s)
+
+
+def width(s: str) -> int:
+    if narrow(s):
+        return len(s)
+
+    return _width(s)
+
+
+# from cells(), so that joined glyphs are measured as they are drawn
+@lru_cache(maxsize=4096)
+def _width(s: str) -> int:
+    return len(_cells(s))
+
+
+# one glyph per column: zero-width characters join the glyph before them, and
+# a wide glyph is followed by "" for the column it spills into
+def cells(s: str) -> list[str]:
+    if narrow(s):
+        return list(s)
+
+    return list(_cells(s))
+
+
+@lru_cache(maxsize=4096)
+def _cells(s: str) -> tuple[str, ...]:
+    out: list[str] = []
+    joined: bool = False
+    for ch in s:
+        n: int = 0 if joined else char_width(ch)
+        joined = ch == ZWJ
+        match n:
+            case 0:
+                if out:
+                    last: int = len(out) - 1 if out[-1] else len(out) - 2
+                    out[last] += ch
+
+            case 1:
+                out.append(ch)
+
+            case _:
+                out.append(ch)
+                out.append("")
+    return tuple(out)
+
+
+# the part of s in columns [start, end), with wide glyphs cut by either edge
+# replaced by spaces so the result is exactly as wide as the columns it covers
+def columns(s: str, start: int, end: int | None = None) -> str:
+    if narrow(s):
+        return s[max(0, start) : end]
+
+    glyphs: list[str] = cells(s)
+    end = len(glyphs) if end is None else min(end, len(glyphs))
+    start = max(0, start)
+    if start >= end:
+        return ""
+
+    out: list[str] = glyphs[start:end]
+    if out[0] == "":
+        out[0] = " "
+    if end < len(glyphs) and glyphs[end] == "":
+        out[-1] = " "
+    return "".join(out)